@@ -0,0 +1,115 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Φυλές: (όνομα, μέση γαλακτοπαραγωγή κιλά, πολυδυμία, βάρος στον πληθυσμό)
+BREEDS = [
+    ("Άγνωστη", 150, 1.4, 0.05),
+    ("Καραγκούνικο", 190, 1.5, 0.25),
+    ("Χιώτικο", 260, 1.9, 0.15),
+    ("Φριζάρτα", 240, 1.8, 0.15),
+    ("Σφακιανό", 130, 1.2, 0.10),
+    ("Μπούτσικο", 120, 1.2, 0.10),
+    ("Lacaune", 300, 1.7, 0.20),
+]
+
+AREAS = [
+    "Ανατολική Μακεδονία & Θράκη", "Κεντρική Μακεδονία", "Δυτική Μακεδονία",
+    "Ήπειρος", "Θεσσαλία", "Ιόνια Νησιά", "Δυτική Ελλάδα", "Στερεά Ελλάδα",
+    "Αττική", "Πελοπόννησος", "Βόρειο Αιγαίο", "Νότιο Αιγαίο", "Κρήτη",
+]
+
+# Κατανομή τοκετών ανά μήνα (κορυφή Νοέμβριο - Φεβρουάριο)
+MONTH_WEIGHTS = np.array([14, 12, 8, 4, 2, 1, 1, 2, 5, 10, 16, 15], dtype=float)
+MONTH_WEIGHTS /= MONTH_WEIGHTS.sum()
+
+# Πιθανότητα Γ.Π. 1..15 (λιγότερα ζώα σε μεγάλες περιόδους)
+LACT_WEIGHTS = 0.75 ** np.arange(15)
+LACT_WEIGHTS /= LACT_WEIGHTS.sum()
+
+# Καμπύλη απόδοσης ανά Γ.Π. (κορυφή στην 3η)
+LACT_FACTOR = np.array([0.80, 0.95, 1.00, 1.00, 0.97, 0.94, 0.90, 0.86,
+                        0.82, 0.78, 0.74, 0.70, 0.66, 0.62, 0.58])
+
+FIRST_YEAR = 2000
+LAST_YEAR = 2024
+RECORDS_PER_HERD = 200
+
+
+def dimensions(rows, seed=42):
+    """Πίνακες breed, area, herds για rows εγγραφές production."""
+    rng = np.random.default_rng(seed)
+    breed = pd.DataFrame({"id": np.arange(1, len(BREEDS) + 1),
+                          "name": [b[0] for b in BREEDS]})
+    area = pd.DataFrame({"ar_id": np.arange(1, len(AREAS) + 1), "ar_name": AREAS})
+
+    n_herds = max(rows // RECORDS_PER_HERD, 1)
+    weights = np.array([b[3] for b in BREEDS])
+    herds = pd.DataFrame({
+        "h_id": np.arange(1, n_herds + 1),
+        "h_breed_id": rng.choice(breed["id"], size=n_herds, p=weights / weights.sum()),
+        "h_area_id": rng.integers(1, len(AREAS) + 1, size=n_herds),
+    })
+    return breed, area, herds
+
+
+def production(rows, herds, seed=42, chunksize=1_000_000):
+    """Γεννήτρια DataFrame του production σε κομμάτια των chunksize γραμμών."""
+    rng = np.random.default_rng(seed + 1)
+    milk_mean = np.array([b[1] for b in BREEDS], dtype=float)
+    prolificacy = np.array([b[2] for b in BREEDS])
+    herd_ids = herds["h_id"].to_numpy()
+    herd_breed = herds["h_breed_id"].to_numpy()
+
+    for start in range(0, rows, chunksize):
+        n = min(chunksize, rows - start)
+        idx = rng.integers(0, len(herd_ids), size=n)
+        breed = herd_breed[idx] - 1
+        year = rng.integers(FIRST_YEAR, LAST_YEAR + 1, size=n)
+        lact = rng.choice(np.arange(1, 16), size=n, p=LACT_WEIGHTS)
+        month = rng.choice(np.arange(1, 13), size=n, p=MONTH_WEIGHTS)
+        day = rng.integers(1, 29, size=n)
+
+        fdays = np.clip(rng.normal(185, 45, size=n), 20, 365).round()
+        # Γάλα (γραμμάρια): lognormal γύρω από τον μέσο της φυλής, ανάλογο της διάρκειας
+        milk = (
+            milk_mean[breed] * LACT_FACTOR[lact - 1] * (fdays / 185) ** 0.8
+            * rng.lognormal(0, 0.25, size=n) * 1000
+        ).round()
+        litter = np.clip(rng.poisson(prolificacy[breed] - 1, size=n) + 1, 1, 4)
+        males = rng.binomial(litter, 0.5)
+
+        chunk = pd.DataFrame({
+            "p_id": np.arange(start + 1, start + n + 1),
+            "p_herd_id": herd_ids[idx],
+            "p_year": year,
+            "p_lact": lact,
+            "p_bdate": pd.to_datetime(
+                pd.DataFrame({"year": year, "month": month, "day": day})
+            ).dt.strftime("%Y-%m-%d"),
+            "p_fdays": fdays,
+            "p_fmilk": milk,
+            "p_males": males.astype(float),
+            "p_females": (litter - males).astype(float),
+        })
+        # Ελλιπείς τιμές, όπως στα πραγματικά δεδομένα
+        for column, share in (("p_fdays", 0.02), ("p_fmilk", 0.03), ("p_bdate", 0.01)):
+            chunk.loc[rng.random(n) < share, column] = None
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Συνθετικά δεδομένα production")
+    parser.add_argument("rows", type=int, help="π.χ. 10000 έως 50000000")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="benchmarks/edataviz.sqlite")
+    args = parser.parse_args()
+
+    from benchmarks.standin import load
+
+    load(args.out, args.rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
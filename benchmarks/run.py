@@ -0,0 +1,183 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = [os.path.join(ROOT, "Αρχική_Σελίδα.py")] + sorted(
+    glob.glob(os.path.join(ROOT, "pages", "0*.py"))
+)
+
+DEFAULT_PARAMS = {
+    "breed": 2, "lact_from": 1, "lact_to": 15,
+    "year_from": 0, "year_to": 9999, "min_days": 90,
+}
+
+
+def _median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(rows, seed=42, repeat=5, path=None):
+    """Φορτώνει (αν χρειάζεται) τη συνθετική βάση και χρονομετρά queries,
+    αναφορές και σελίδες. Επιστρέφει dict για σύγκριση με compare()."""
+    from benchmarks import standin
+
+    path = path or f"benchmarks/edataviz_{rows}_{seed}.sqlite"
+    # Η εφαρμογή διαβάζει το DB_URL κατά το import του data.db
+    os.environ["DB_URL"] = f"sqlite:///{path}"
+    os.environ["WARM_BUDGET"] = "0"      # χωρίς warmer κατά τις μετρήσεις
+    os.environ["LOOKUP_REFRESH"] = "0"
+
+    results = {}
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        standin.load(path, rows, seed)
+        results["load:standin"] = (time.perf_counter() - start) * 1000
+
+    from data import queries, queries_lookup, queries_raw, stats
+    from data.db import disk_cache, engine, query_df, result_cache
+    from data.dialect import is_query
+
+    standin.register(engine)
+
+    def clear():
+        result_cache.clear()
+        if disk_cache is not None:
+            disk_cache.clear()
+        stats.cell_store.clear()
+
+    # Queries (τα DATA_BREEDS_* παίρνουν λίστα φυλών)
+    query_params = {**DEFAULT_PARAMS, "breeds": [DEFAULT_PARAMS["breed"]]}
+    for module in (queries, queries_lookup, queries_raw):
+        for name, sql in vars(module).items():
+            if name.isupper() and is_query(sql):
+                results[f"query:{name}"] = _median_ms(
+                    lambda: query_df(sql, query_params, cache=False), repeat
+                )
+
+    # Αναφορές της μηχανής κελιών (κρύα και ζεστή cache)
+    for name, report in stats.REPORTS.items():
+        def cold():
+            clear()
+            report.__wrapped__(**DEFAULT_PARAMS)
+        results[f"report:{name}:cold"] = _median_ms(cold, repeat)
+        results[f"report:{name}:warm"] = _median_ms(
+            lambda: report.__wrapped__(**DEFAULT_PARAMS), repeat
+        )
+
+    # Πλήρης headless εκτέλεση κάθε σελίδας
+    from streamlit.testing.v1 import AppTest
+
+    for page in PAGES:
+        def render():
+            app = AppTest.from_file(page, default_timeout=120).run()
+            if app.exception:
+                raise RuntimeError(f"{page}: {app.exception[0].message}")
+
+        label = os.path.splitext(os.path.basename(page))[0]
+        results[f"page:{label}:cold"] = _median_ms(lambda: (clear(), render()), repeat)
+        results[f"page:{label}:warm"] = _median_ms(render, repeat)
+
+    return {
+        "meta": {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "rows": rows,
+            "seed": seed,
+            "repeat": repeat,
+            "commit": _commit(),
+            "python": platform.python_version(),
+        },
+        "results_ms": results,
+    }
+
+
+# Οι αναφορές εκατοστημορίων πρέπει να κοστίζουν περίπου όσο οι αντίστοιχες
+# των μέσων όρων (κρύα cache)
+QUANTILE_PAIRS = {"year_quantiles": "year", "month_quantiles": "month", "lact_quantiles": "lact"}
+QUANTILE_RATIO = 2.0
+
+
+def check_quantiles(result, limit=QUANTILE_RATIO):
+    """Τυπώνει τον λόγο χρόνων εκατοστημόρια / μέσοι όροι και επιστρέφει
+    όσες αναφορές τον ξεπερνούν."""
+    results = result["results_ms"]
+    slow = []
+    for name, base in QUANTILE_PAIRS.items():
+        ratio = results[f"report:{name}:cold"] / results[f"report:{base}:cold"]
+        print(f"{name} / {base}: {ratio:.2f}")
+        if ratio > limit:
+            slow.append(name)
+    return slow
+
+
+def compare(base, new, threshold=1.2):
+    """Τυπώνει τις διαφορές και επιστρέφει τα ονόματα που χειροτέρεψαν."""
+    regressions = []
+    print(f"{'μέτρηση':<48}{'base':>10}{'new':>10}{'x':>8}")
+    for name, before in base["results_ms"].items():
+        after = new["results_ms"].get(name)
+        if after is None or name.startswith("load:"):
+            continue
+        ratio = after / before if before else float("inf")
+        flag = " <-- " if ratio > threshold else ""
+        print(f"{name:<48}{before:>10.1f}{after:>10.1f}{ratio:>8.2f}{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmarks του eDataViz")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run")
+    run_parser.add_argument("rows", type=int, help="εγγραφές production (10k - 50M)")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--db", help="αρχείο SQLite (αλλιώς benchmarks/edataviz_<rows>_<seed>.sqlite)")
+    run_parser.add_argument("--out", help="αρχείο JSON αποτελεσμάτων")
+    cmp_parser = sub.add_parser("compare")
+    cmp_parser.add_argument("base")
+    cmp_parser.add_argument("new")
+    cmp_parser.add_argument("--threshold", type=float, default=1.2,
+                            help="λόγος new / base πάνω από τον οποίο θεωρείται regression")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        result = run(args.rows, args.seed, args.repeat, args.db)
+        out = args.out or f"benchmarks/results_{args.rows}_{result['meta']['commit']}.json"
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"Αποτελέσματα: {out}")
+        sys.exit(1 if check_quantiles(result) else 0)
+    else:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.new, encoding="utf-8") as f:
+            new = json.load(f)
+        sys.exit(1 if compare(base, new, args.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import math
+import os
+import re
+
+from sqlalchemy import create_engine, event, text
+
+from benchmarks import generate
+
+# ------------------------------------------------------
+# SQLite ως τοπικό υποκατάστατο της MariaDB: οι συναρτήσεις MySQL που
+# χρησιμοποιούν τα queries καταχωρούνται ως συναρτήσεις Python και τα
+# %(name)s μετατρέπονται σε :name.
+# ------------------------------------------------------
+SCHEMA = [
+    "CREATE TABLE breed (id INTEGER PRIMARY KEY, name TEXT)",
+    "CREATE TABLE area (ar_id INTEGER PRIMARY KEY, ar_name TEXT)",
+    "CREATE TABLE herds (h_id INTEGER PRIMARY KEY, h_breed_id INTEGER, h_area_id INTEGER)",
+    """
+CREATE TABLE production (
+    p_id INTEGER PRIMARY KEY,
+    p_herd_id INTEGER,
+    p_year INTEGER,
+    p_lact INTEGER,
+    p_bdate TEXT,
+    p_fdays REAL,
+    p_fmilk REAL,
+    p_males REAL,
+    p_females REAL
+)
+""",
+    "CREATE INDEX idx_herds_breed ON herds (h_breed_id, h_id)",
+    "CREATE INDEX idx_production_herd ON production (p_herd_id)",
+]
+
+_PLACEHOLDER = re.compile(r"%\((\w+)\)s")
+
+
+class _Std:
+    """STD() της MySQL (τυπική απόκλιση πληθυσμού), με Welford."""
+
+    def __init__(self):
+        self.n, self.mean, self.m2 = 0, 0.0, 0.0
+
+    def step(self, value):
+        if value is None:
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def finalize(self):
+        return math.sqrt(self.m2 / self.n) if self.n else None
+
+
+def _nulls(fn):
+    def wrapper(*args):
+        return None if any(a is None for a in args) else fn(*args)
+    return wrapper
+
+
+def _register_functions(dbapi_conn, _):
+    dbapi_conn.create_function("MONTH", 1, _nulls(lambda d: int(str(d)[5:7])))
+    dbapi_conn.create_function("FLOOR", 1, _nulls(math.floor))
+    dbapi_conn.create_function("POW", 2, _nulls(math.pow))
+    dbapi_conn.create_function("SQRT", 1, _nulls(math.sqrt))
+    dbapi_conn.create_function("GREATEST", -1, _nulls(max))
+    dbapi_conn.create_function("CONCAT", -1, _nulls(lambda *a: "".join(map(str, a))))
+    dbapi_conn.create_aggregate("STD", 1, _Std)
+
+
+def _translate(conn, cursor, statement, parameters, context, executemany):
+    return _PLACEHOLDER.sub(r":\1", statement), parameters
+
+
+def register(engine):
+    """Προσαρμόζει ένα sqlite engine ώστε να τρέχει τα queries της εφαρμογής."""
+    event.listen(engine, "connect", _register_functions)
+    event.listen(engine, "before_cursor_execute", _translate, retval=True)
+    engine.dispose()  # νέες συνδέσεις, με τις συναρτήσεις καταχωρημένες
+    return engine
+
+
+def build_cube(engine):
+    """Χτίζει τους πίνακες του data/rollup.py με το ίδιο SQL όπως στη MariaDB."""
+    from data.rollup import ROLLUPS, ddl_statements
+
+    with engine.begin() as conn:
+        for table, ddl, build in ROLLUPS:
+            create, indexes = ddl_statements(ddl, table)
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+            conn.execute(text(create))
+            conn.execute(text(build.format(table=table)))
+            for index in indexes:
+                conn.execute(text(index))
+
+
+def load(path, rows, seed=42):
+    """Δημιουργεί από την αρχή τη βάση SQLite με rows συνθετικές εγγραφές."""
+    if os.path.exists(path):
+        os.remove(path)
+    engine = register(create_engine(f"sqlite:///{path}"))
+
+    breed, area, herds = generate.dimensions(rows, seed)
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.execute(text(statement))
+        breed.to_sql("breed", conn, if_exists="append", index=False)
+        area.to_sql("area", conn, if_exists="append", index=False)
+        herds.to_sql("herds", conn, if_exists="append", index=False)
+
+    for chunk in generate.production(rows, herds, seed):
+        with engine.begin() as conn:
+            chunk.to_sql("production", conn, if_exists="append", index=False,
+                         chunksize=50_000)
+
+    build_cube(engine)
+    return engine
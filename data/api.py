@@ -0,0 +1,130 @@
+import argparse
+import io
+from contextlib import asynccontextmanager
+
+import pyarrow as pa
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from data import changes, lookups, stats
+from data.cache import frame_hash
+
+# ------------------------------------------------------
+# HTTP API χωρίς UI: οι ίδιες αναφορές με τις σελίδες (data/stats.py,
+# ίδια cache αποτελεσμάτων), σε JSON ή Arrow IPC, με ETag.
+# Starlette / uvicorn έρχονται ήδη με το Streamlit.
+# ------------------------------------------------------
+
+# Διαδρομή -> αναφορά του stats.REPORTS
+API_REPORTS = {
+    "year": "year",
+    "totals": "totals",
+    "month": "month",
+    "lact": "lact",
+    "class": "class",
+}
+
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+
+_INT_PARAMS = ("breed", "lact_from", "lact_to", "year_from", "year_to", "min_days")
+
+
+def _params(query):
+    """Φίλτρα από το query string, με τις προεπιλογές των σελίδων."""
+    years = lookups.years()
+    params = {
+        "lact_from": 1,
+        "lact_to": 15,
+        "min_days": 90,
+        "year_from": years[0] if years else 0,
+        "year_to": years[-1] if years else 0,
+    }
+    for name in _INT_PARAMS:
+        if name in query:
+            try:
+                params[name] = int(query[name])
+            except ValueError:
+                raise ValueError(f"Μη έγκυρη τιμή για την παράμετρο {name}.") from None
+    if "breed" not in params:
+        raise ValueError("Λείπει η παράμετρος breed.")
+    return params
+
+
+def _wants_arrow(request):
+    fmt = request.query_params.get("format")
+    if fmt is not None:
+        return fmt == "arrow"
+    return ARROW_TYPE in request.headers.get("accept", "")
+
+
+def _arrow_body(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+async def report(request):
+    name = API_REPORTS.get(request.path_params["report"])
+    if name is None:
+        return JSONResponse({"error": "Άγνωστη αναφορά."}, status_code=404)
+    try:
+        params = _params(request.query_params)
+    except ValueError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+
+    # Οι αναφορές είναι blocking (βάση / cache)· τρέχουν σε thread pool
+    df = await run_in_threadpool(lambda: stats.REPORTS[name](**params))
+
+    arrow = _wants_arrow(request)
+    etag = f'"{frame_hash(df)}-{"arrow" if arrow else "json"}"'
+    headers = {"ETag": etag, "Vary": "Accept"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    if arrow:
+        return Response(_arrow_body(df), media_type=ARROW_TYPE, headers=headers)
+    return Response(
+        df.to_json(orient="records", force_ascii=False),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+async def index(request):
+    return JSONResponse({
+        "reports": sorted(API_REPORTS),
+        "params": list(_INT_PARAMS),
+        "formats": ["json", "arrow"],
+    })
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Ακύρωση της cache όταν αλλάξουν τα δεδομένα (ETag κατά συνέπεια)
+    changes.start()
+    yield
+
+
+app = Starlette(routes=[
+    Route("/", index),
+    Route("/{report:str}", report),
+], lifespan=lifespan)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="HTTP API των αναφορών")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    uvicorn.run("data.api:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:  # Windows: χωρίς lock μεταξύ processes
+    fcntl = None
+
+
+def _normalize(value):
+    """Μετατρέπει numpy/pandas scalars σε απλούς τύπους Python."""
+    if hasattr(value, "item"):
+        return value.item()
+    return value
+
+
+@functools.lru_cache(maxsize=256)
+def sql_text(sql):
+    """Κανονικοποιημένο κείμενο SQL (οι εκφράσεις Core μεταγλωττίζονται μία φορά)."""
+    return " ".join(str(sql).split())
+
+
+_TABLE = re.compile(r"\b(?:FROM|JOIN)\s+[`\"]?(\w+)", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=256)
+def tables(sql):
+    """Πίνακες που διαβάζει ένα query (ονόματα μετά από FROM / JOIN)."""
+    return frozenset(name.lower() for name in _TABLE.findall(sql_text(sql)))
+
+
+def make_key(sql, params=None):
+    """Κλειδί cache: κείμενο SQL + κανονικοποιημένες παράμετροι."""
+    items = tuple(sorted((k, _normalize(v)) for k, v in (params or {}).items()))
+    return (sql_text(sql), items)
+
+
+def frame_size(df):
+    """Μέγεθος DataFrame σε bytes (μαζί με object στήλες)."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def frame_hash(df):
+    """Hash περιεχομένου (τιμές, στήλες, index) ενός DataFrame."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    digest.update(repr(list(df.columns)).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """LRU cache αποτελεσμάτων με TTL και όριο μνήμης, κοινή για όλο το process.
+
+    Κάθε αποτέλεσμα θυμάται τους πίνακες του query του (key[0], βλ. make_key),
+    ώστε μια αλλαγή δεδομένων να ακυρώνει μόνο ό,τι εξαρτάται από αυτήν
+    (invalidate, data/changes.py).
+    """
+
+    def __init__(self, ttl=600, max_bytes=256 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0  # αυξάνεται σε κάθε clear() / invalidate()
+        self._entries = OrderedDict()  # key -> (expires, size, df, πίνακες)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2].copy()
+
+    def set(self, key, df):
+        size = frame_size(df)
+        # Αποτελέσματα μεγαλύτερα από όλη τη cache δεν αποθηκεύονται
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (
+                time.monotonic() + self.ttl, size, df.copy(), tables(key[0])
+            )
+            self._bytes += size
+            # LRU eviction μέχρι να χωρέσει στο όριο
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.generation += 1
+
+    def invalidate(self, names):
+        """Αφαιρεί τα αποτελέσματα που διαβάζουν κάποιον από τους πίνακες names·
+        επιστρέφει πόσα αφαιρέθηκαν."""
+        names = frozenset(names)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[3] & names]
+            for key in stale:
+                self._drop(key)
+            self.generation += 1
+            return len(stale)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _drop(self, key):
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+# ------------------------------------------------------
+# Cache στον δίσκο, κοινή για όλα τα processes του host (π.χ. πολλά
+# Streamlit workers πίσω από load balancer): αρχεία Arrow IPC κάτω από
+# έναν φάκελο, με ευρετήριο SQLite. Επιβιώνει από επανεκκινήσεις.
+# ------------------------------------------------------
+LOCK_STRIPES = 256
+
+_DISK_DDL = """
+CREATE TABLE IF NOT EXISTS entries (
+    name     TEXT PRIMARY KEY,
+    tables   TEXT NOT NULL,
+    expires  REAL NOT NULL,
+    size     INTEGER NOT NULL,
+    used     REAL NOT NULL,
+    arrow    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+CREATE TABLE IF NOT EXISTS meta (
+    name     TEXT PRIMARY KEY,
+    value    TEXT NOT NULL
+);
+"""
+
+
+def _arrow_types(arrow_type):
+    # Arrow-backed στήλες όπως τις φτιάχνει το compact (οι κατηγορίες μένουν category)
+    return None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+
+
+class DiskCache:
+    """Αποτελέσματα ως αρχεία Arrow IPC στον φάκελο path, με TTL και όριο
+    μεγέθους (LRU). Το ευρετήριο (SQLite) έχει το δικό του locking, τα
+    αρχεία γράφονται ατομικά (rename) και διαβάζονται με memory map."""
+
+    def __init__(self, path, ttl=600, max_bytes=1024 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(path, exist_ok=True)
+        with self._index() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(_DISK_DDL)
+
+    @contextmanager
+    def _index(self):
+        db = sqlite3.connect(os.path.join(self.path, "index.sqlite"), timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def _name(key):
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+    def _file(self, name):
+        return os.path.join(self.path, name + ".arrow")
+
+    @contextmanager
+    def lock(self, key, on_wait=None, poll=0.1):
+        """Lock ανά κλειδί (flock) για όλα τα processes: ένα μόνο εκτελεί το
+        query, τα υπόλοιπα βρίσκουν μετά το αποτέλεσμα στον δίσκο.
+        Το on_wait() καλείται σε κάθε αναμονή (π.χ. για διακοπή)."""
+        if fcntl is None:
+            yield
+            return
+        stripe = int(self._name(key), 16) % LOCK_STRIPES
+        with open(os.path.join(self.path, f"lock_{stripe}"), "a") as f:
+            while True:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if on_wait is not None:
+                        on_wait()
+                    time.sleep(poll)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def get(self, key):
+        name = self._name(key)
+        now = time.time()
+        with self._index() as db:
+            row = db.execute(
+                "SELECT arrow FROM entries WHERE name = ? AND expires >= ?", (name, now)
+            ).fetchone()
+            if row is not None:
+                db.execute("UPDATE entries SET used = ? WHERE name = ?", (now, name))
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            with pa.memory_map(self._file(name)) as source:
+                table = pa.ipc.open_file(source).read_all()
+        except (OSError, pa.ArrowInvalid):
+            # Το αρχείο αφαιρέθηκε στο μεταξύ (invalidate / eviction άλλου process)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return table.to_pandas(types_mapper=_arrow_types if row[0] else None)
+
+    def set(self, key, df):
+        name = self._name(key)
+        table = pa.Table.from_pandas(df)
+        path = self._file(name)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        size = os.path.getsize(tmp)
+        if size > self.max_bytes:
+            os.remove(tmp)
+            return
+        os.replace(tmp, path)
+
+        now = time.time()
+        arrow = any(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+        with self._index() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (name, "," + ",".join(sorted(tables(key[0]))) + ",",
+                 now + self.ttl, size, now, int(arrow)),
+            )
+            evicted = self._evict(db)
+        self._remove(evicted)
+
+    def _evict(self, db):
+        # LRU μέχρι να χωρέσει στο όριο, και όσα έληξαν
+        evicted = [
+            name for (name,) in db.execute(
+                "SELECT name FROM entries WHERE expires < ?", (time.time(),)
+            )
+        ]
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        for name, size in db.execute("SELECT name, size FROM entries ORDER BY used"):
+            if total <= self.max_bytes:
+                break
+            if name not in evicted:
+                evicted.append(name)
+                total -= size
+        db.executemany("DELETE FROM entries WHERE name = ?", [(n,) for n in evicted])
+        return evicted
+
+    def _remove(self, names):
+        for name in names:
+            try:
+                os.remove(self._file(name))
+            except FileNotFoundError:
+                pass
+
+    def invalidate(self, names):
+        """Αφαιρεί τα αποτελέσματα που διαβάζουν κάποιον από τους πίνακες names."""
+        with self._index() as db:
+            stale = [
+                name for (name,) in db.execute(
+                    "SELECT name FROM entries WHERE "
+                    + " OR ".join("tables LIKE ?" for _ in names),
+                    [f"%,{table},%" for table in names],
+                )
+            ] if names else []
+            db.executemany("DELETE FROM entries WHERE name = ?", [(n,) for n in stale])
+        self._remove(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._index() as db:
+            names = [name for (name,) in db.execute("SELECT name FROM entries")]
+            db.execute("DELETE FROM entries")
+        self._remove(names)
+
+    def meta(self, name):
+        """Τιμή (JSON) που μοιράζονται τα processes, π.χ. τα αποτυπώματα του data/changes.py."""
+        with self._index() as db:
+            row = db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_meta(self, name, value):
+        with self._index() as db:
+            db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, json.dumps(value)))
+
+    def stats(self):
+        with self._index() as db:
+            entries, size = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
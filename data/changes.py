@@ -0,0 +1,146 @@
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import bindparam, func, select, text
+
+from data import lookups, stats
+from data.cache import tables
+from data.db import disk_cache, engine, result_cache
+from data.dialect import area, breed, herds, production, production_cube
+from data.queries_lookup import LOOKUP_AREAS, LOOKUP_BREEDS, LOOKUP_LACTS, LOOKUP_YEARS
+
+log = logging.getLogger(__name__)
+
+# ------------------------------------------------------
+# Ανίχνευση αλλαγών δεδομένων: φθηνό αποτύπωμα ανά πίνακα σε τακτό
+# διάστημα· όταν αλλάξει, ακυρώνονται μόνο τα αποτελέσματα / οι πίνακες
+# αναφοράς που τον διαβάζουν. Έτσι το CACHE_TTL μπορεί να είναι μεγάλο.
+# ------------------------------------------------------
+CHANGE_POLL = float(os.getenv("CHANGE_POLL", "30"))  # δευτ. (0 = όχι)
+
+# Αποτύπωμα -> πίνακες που καλύπτει
+WATCHED = {
+    "production": ("production",),
+    "herds": ("herds",),
+    "breed": ("breed",),
+    "area": ("area",),
+    # Τα aggregates ανανεώνονται πάντα μαζί (data/rollup.py, data/refresh.py)
+    "production_cube": ("production_cube", "production_milk_hist", "production_sketch"),
+}
+
+# Πλήθος, μέγιστο κλειδί και ένα άθροισμα-checksum για αλλαγές στη θέση τους
+FINGERPRINTS = {
+    "production": select(func.count(), func.max(production.c.p_id)),
+    "herds": select(func.count(), func.max(herds.c.h_id), func.sum(herds.c.h_breed_id)),
+    "breed": select(func.count(), func.max(breed.c.id), func.sum(func.length(breed.c.name))),
+    "area": select(func.count(), func.max(area.c.ar_id), func.sum(func.length(area.c.ar_name))),
+    "production_cube": select(func.count(), func.sum(production_cube.c.n_rows)),
+}
+
+# Στη MariaDB / MySQL αρκεί το information_schema (χωρίς COUNT σε μεγάλους
+# πίνακες): AUTO_INCREMENT για νέες εγγραφές, UPDATE_TIME για κάθε εγγραφή.
+# Στη MySQL 8 χρειάζεται information_schema_stats_expiry = 0.
+SCHEMA_FINGERPRINTS = text(
+    "SELECT TABLE_NAME, AUTO_INCREMENT, UPDATE_TIME FROM information_schema.TABLES "
+    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN :names"
+).bindparams(bindparam("names", expanding=True))
+
+AGGREGATES = frozenset(WATCHED["production_cube"])
+LOOKUP_TABLES = frozenset().union(
+    *(tables(q) for q in (LOOKUP_AREAS, LOOKUP_BREEDS, LOOKUP_LACTS, LOOKUP_YEARS))
+)
+
+
+def fingerprints():
+    """{όνομα του WATCHED: αποτύπωμα (κείμενο)} για την τρέχουσα κατάσταση της βάσης."""
+    with engine.connect() as conn:
+        if engine.dialect.name == "mysql":
+            rows = conn.execute(SCHEMA_FINGERPRINTS, {"names": list(WATCHED)})
+            prints = {name: (auto_increment, updated) for name, auto_increment, updated in rows}
+        else:
+            prints = {
+                name: tuple(conn.execute(query).one()) for name, query in FINGERPRINTS.items()
+            }
+    # Κείμενο, ώστε να αποθηκεύεται και στην cache του δίσκου
+    return {name: repr(value) for name, value in prints.items()}
+
+
+def invalidate(names):
+    """Ακυρώνει ό,τι διαβάζει κάποιον από τους πίνακες names."""
+    names = frozenset(names)
+    dropped = result_cache.invalidate(names)
+    if disk_cache is not None:
+        dropped += disk_cache.invalidate(names)
+    if names & AGGREGATES:
+        stats.cell_store.clear()
+    if names & LOOKUP_TABLES:
+        try:
+            lookups.registry.load()
+        except Exception:
+            # Κρατάμε τα προηγούμενα δεδομένα αν αποτύχει η ανανέωση
+            log.exception("Αποτυχία ανανέωσης πινάκων αναφοράς")
+    return dropped
+
+
+class ChangeDetector:
+    """Συγκρίνει τα αποτυπώματα κάθε poll δευτ. και ακυρώνει ό,τι άλλαξε."""
+
+    def __init__(self, poll=CHANGE_POLL):
+        self.poll = poll
+        self.seen = None
+        self.last_change = None
+        self._listeners = []
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """callback(πίνακες) μετά από κάθε ακύρωση (π.χ. νέα προθέρμανση)."""
+        self._listeners.append(callback)
+
+    def check(self):
+        """Ένας έλεγχος· επιστρέφει τους πίνακες που άλλαξαν."""
+        current = fingerprints()
+        if self.seen is None:
+            # Πρώτος έλεγχος: σύγκριση με ό,τι είδε τελευταία οποιοδήποτε process
+            # (η cache του δίσκου επιβιώνει από επανεκκινήσεις)
+            self.seen = (disk_cache.meta("fingerprints") if disk_cache else None) or current
+        changed = {name for name in WATCHED if current.get(name) != self.seen.get(name)}
+        self.seen = current
+        if disk_cache is not None:
+            disk_cache.set_meta("fingerprints", current)
+        if not changed:
+            return set()
+
+        names = set().union(*(WATCHED[name] for name in changed))
+        dropped = invalidate(names)
+        self.last_change = {"time": time.time(), "tables": sorted(names), "dropped": dropped}
+        log.info("Αλλαγή στους πίνακες %s: ακυρώθηκαν %d αποτελέσματα", sorted(names), dropped)
+        for callback in self._listeners:
+            callback(names)
+        return names
+
+    def start(self):
+        """Ξεκινά το thread του ελέγχου (μία φορά ανά process)."""
+        with self._lock:
+            if self._thread is None and self.poll > 0:
+                self._thread = threading.Thread(
+                    target=self._run, name="change-detector", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.check()
+            except Exception:
+                log.exception("Αποτυχία ελέγχου αλλαγών δεδομένων")
+            time.sleep(self.poll)
+
+
+detector = ChangeDetector()
+
+
+def start():
+    detector.start()
@@ -1,20 +1,632 @@
+import functools
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.pool import NullPool, QueuePool
 import pandas as pd
 from dotenv import load_dotenv
 
+from data import instrument
+from data.cache import DiskCache, ResultCache, frame_size, make_key, sql_text, tables
+from data.frames import compact
+
 load_dotenv()
 
-DB_URL = (
+# Εσωτερικά API του Streamlit, που έχουν αλλάξει θέση μεταξύ εκδόσεων· αν
+# λείπουν, τα queries απλώς δεν ακυρώνονται όταν αντικατασταθεί το run
+try:
+    from streamlit.runtime.scriptrunner import StopException, get_script_run_ctx
+except ImportError:
+    StopException = Exception
+
+    def get_script_run_ctx(suppress_warning=False):
+        return None
+try:
+    from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequestType
+except ImportError:
+    ScriptRequestType = None
+
+# Το DB_URL μπορεί να δοθεί ολόκληρο: τα queries των αναφορών (data/queries*)
+# μεταγλωττίζονται για MariaDB, PostgreSQL, SQLite και DuckDB
+DB_URL = os.getenv("DB_URL") or (
     f"mysql+pymysql://{os.getenv('DB_USER')}:{os.getenv('DB_PASS')}"
     f"@{os.getenv('DB_HOST')}/{os.getenv('DB_NAME')}?charset=utf8mb4"
-    # f"postgresql+psycopg2://{os.getenv('DB_USER')}:{os.getenv('DB_PASS')}"
-    # f"@{os.getenv('DB_HOST')}/{os.getenv('DB_NAME')}"
 )
 
-engine = create_engine(DB_URL, pool_pre_ping=True)
+# Connection pool (ανά process)· τα όρια ισχύουν για το QueuePool, την
+# προεπιλογή των MariaDB / PostgreSQL / SQLite σε αρχείο. Άλλα pools (π.χ.
+# SingletonThreadPool της sqlite:///:memory:) δεν τα δέχονται, εκτός αν
+# δοθούν ρητά.
+_POOL_ENV = {
+    "pool_size": ("DB_POOL_SIZE", "5", int),
+    "max_overflow": ("DB_MAX_OVERFLOW", "10", int),
+    "pool_timeout": ("DB_POOL_TIMEOUT", "30", float),  # δευτ. αναμονής για σύνδεση
+}
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))  # δευτ. ζωής σύνδεσης
+
+
+def _pool_options(url):
+    url = make_url(url)
+    queue_pool = issubclass(url.get_dialect().get_pool_class(url), QueuePool)
+    return {
+        option: cast(os.getenv(var, default))
+        for option, (var, default, cast) in _POOL_ENV.items()
+        if queue_pool or os.getenv(var)
+    }
+
+
+engine = create_engine(
+    DB_URL,
+    pool_pre_ping=True,
+    pool_recycle=DB_POOL_RECYCLE,
+    **_pool_options(DB_URL),
+)
+instrument.install(engine)
+
+# "sql" (MariaDB) ή "parquet" (τοπικό snapshot, βλ. data/snapshot.py)
+DATA_BACKEND = os.getenv("DATA_BACKEND", "sql")
+
+CACHE_TTL = int(os.getenv("CACHE_TTL", "600"))
+
+# Μέγιστος χρόνος εκτέλεσης ανά query (δευτ., 0 = χωρίς όριο)
+QUERY_TIMEOUT = float(os.getenv("QUERY_TIMEOUT", "120"))
+
+# Κοινή cache αποτελεσμάτων για όλα τα sessions / σελίδες του process
+result_cache = ResultCache(
+    ttl=CACHE_TTL,
+    max_bytes=int(os.getenv("CACHE_MAX_MB", "256")) * 1024 * 1024,
+)
+
+# Δεύτερο επίπεδο στον δίσκο, κοινό για όλα τα processes του host ("" = όχι)
+CACHE_DIR = os.getenv("CACHE_DIR", "")
+
+disk_cache = DiskCache(
+    CACHE_DIR,
+    ttl=CACHE_TTL,
+    max_bytes=int(os.getenv("CACHE_DISK_MB", "1024")) * 1024 * 1024,
+) if CACHE_DIR else None
+
+
+# ------------------------------------------------------
+# Ακύρωση queries: κάθε query δένεται με το script run που το ζήτησε.
+# Όταν το Streamlit το αντικαταστήσει (νέα επιλογή -> rerun, κλείσιμο
+# σελίδας), το query διακόπτεται στον server αντί να τρέχει για κανέναν.
+# ------------------------------------------------------
+CANCEL_POLL = 0.2  # δευτ. μεταξύ ελέγχων του watcher
+
+# Όριο χρόνου στον ίδιο τον server, μόνο για τα queries των αναφορών
+# (query_df / query_chunks)· οι εργασίες συντήρησης (rollup, refresh,
+# migrations, snapshot) τρέχουν χωρίς όριο. (εντολή, επαναφορά): η
+# επαναφορά τρέχει πριν η σύνδεση γυρίσει στο pool· το SET LOCAL της
+# PostgreSQL αναιρείται μόνο του με το rollback της επιστροφής. Στις
+# υπόλοιπες βάσεις το QUERY_TIMEOUT το εφαρμόζει ο watcher.
+_SERVER_TIMEOUT = {
+    "mariadb": ("SET SESSION max_statement_time = {seconds}", "SET SESSION max_statement_time = 0"),
+    "mysql": ("SET SESSION max_execution_time = {ms}", "SET SESSION max_execution_time = 0"),
+    "postgresql": ("SET LOCAL statement_timeout = {ms}", None),
+}
+
+
+class QueryCancelled(StopException):
+    """Το script run που ζήτησε το query αντικαταστάθηκε· το Streamlit
+    σταματά σιωπηλά το παλιό run και εκτελεί το νέο."""
+
+
+def _timeout_sql():
+    """(εντολή, επαναφορά) του ορίου στον server, ή None."""
+    name = engine.dialect.name
+    if name == "mysql" and getattr(engine.dialect, "is_mariadb", False):
+        name = "mariadb"
+    statements = _SERVER_TIMEOUT.get(name)
+    if statements is None or QUERY_TIMEOUT <= 0:
+        return None
+    statement, reset = statements
+    return statement.format(seconds=QUERY_TIMEOUT, ms=int(QUERY_TIMEOUT * 1000)), reset
+
+
+@contextmanager
+def _server_timeout(conn):
+    """Το όριο QUERY_TIMEOUT στη σύνδεση conn, για όσο κρατά το query."""
+    statements = _timeout_sql()
+    if statements is None:
+        yield
+        return
+    statement, reset = statements
+    conn.exec_driver_sql(statement)
+    try:
+        yield
+    finally:
+        if reset is not None:
+            try:
+                conn.exec_driver_sql(reset)
+            except Exception:
+                # Η σύνδεση δεν ξαναχρησιμοποιείται με το όριο ενεργό
+                conn.invalidate()
+
+
+# (run, συνεδρία) του caller όταν το query τρέχει σε thread του query_many
+_caller = ContextVar("query_caller", default=None)
+
+_running = []
+_running_lock = threading.Lock()
+_watcher = None
+_killer = None
+
+
+def _current_caller():
+    """(requests του script run, συνεδρία)· εκτός Streamlit (None, ομάδα threads)."""
+    caller = _caller.get()
+    if caller is None:
+        ctx = get_script_run_ctx(suppress_warning=True)
+        if ctx is not None:
+            caller = (getattr(ctx, "script_requests", None), ctx.session_id)
+        else:
+            # π.χ. "warm_3" -> "warm": όλος ο warmer μετρά ως μία συνεδρία
+            caller = (None, threading.current_thread().name.rstrip("0123456789_"))
+    return caller
+
+
+def _current_run():
+    """Τα requests του τρέχοντος script run (None εκτός Streamlit)."""
+    return _current_caller()[0]
+
+
+def _superseded(run):
+    """Εκκρεμές rerun / stop: το run που τρέχει δεν θα εμφανιστεί.
+
+    Διαβάζει το ιδιωτικό ScriptRequests._state· σε έκδοση του Streamlit
+    χωρίς αυτό επιστρέφει πάντα False (καμία ακύρωση).
+    """
+    if run is None or ScriptRequestType is None:
+        return False
+    state = getattr(run, "_state", None)
+    return state is not None and state != ScriptRequestType.CONTINUE
+
+
+def _interrupt(dbapi_conn):
+    """Διακόπτει το query που τρέχει στη σύνδεση (από άλλο thread)."""
+    global _killer
+    name = engine.dialect.name
+    if name == "mysql":
+        # KILL QUERY από ξεχωριστή σύνδεση, εκτός pool (που μπορεί να είναι γεμάτο)
+        if _killer is None:
+            _killer = create_engine(engine.url, poolclass=NullPool)
+        with _killer.connect() as conn:
+            conn.exec_driver_sql(f"KILL QUERY {int(dbapi_conn.thread_id())}")
+    elif name == "postgresql":
+        dbapi_conn.cancel()
+    else:
+        # sqlite3 / duckdb
+        dbapi_conn.interrupt()
+
+
+def _watch():
+    while True:
+        time.sleep(CANCEL_POLL)
+        now = time.monotonic()
+        victims = []
+        with _running_lock:
+            for entry in _running:
+                if entry["reason"] is not None:
+                    continue
+                if _superseded(entry["run"]):
+                    entry["reason"] = "superseded"
+                elif entry["deadline"] is not None and now >= entry["deadline"]:
+                    entry["reason"] = "timeout"
+                else:
+                    continue
+                victims.append(entry)
+        # Εκτός του _running_lock: το KILL QUERY ανοίγει νέα σύνδεση και δεν
+        # πρέπει να καθυστερεί τα υπόλοιπα queries. Το lock της εγγραφής
+        # κρατά τη σύνδεση εκτός pool όσο τη διακόπτουμε.
+        for entry in victims:
+            with entry["lock"]:
+                if entry["done"]:
+                    continue
+                try:
+                    _interrupt(entry["dbapi"])
+                except Exception:
+                    entry["reason"] = None
+
+
+@contextmanager
+def _cancellable(conn):
+    """Το query στη σύνδεση conn διακόπτεται όταν το run αντικατασταθεί
+    (QueryCancelled) ή, χωρίς όριο στον server, μετά από QUERY_TIMEOUT."""
+    global _watcher
+    run = _current_run()
+    if _superseded(run):
+        raise QueryCancelled()
+    deadline = None
+    if QUERY_TIMEOUT > 0 and _timeout_sql() is None:
+        deadline = time.monotonic() + QUERY_TIMEOUT
+    if run is None and deadline is None:
+        yield
+        return
+    entry = {
+        "dbapi": conn.connection.dbapi_connection,
+        "run": run,
+        "deadline": deadline,
+        "reason": None,
+        "lock": threading.Lock(),
+        "done": False,
+    }
+    with _running_lock:
+        _running.append(entry)
+        if _watcher is None:
+            _watcher = threading.Thread(target=_watch, name="query-cancel", daemon=True)
+            _watcher.start()
+    try:
+        yield
+    except Exception:
+        if entry["reason"] == "superseded":
+            raise QueryCancelled() from None
+        if entry["reason"] == "timeout":
+            raise TimeoutError(f"Το query ξεπέρασε το όριο των {QUERY_TIMEOUT:g} δευτ.") from None
+        raise
+    finally:
+        with _running_lock:
+            _running.remove(entry)
+        with entry["lock"]:
+            entry["done"] = True
+
+
+# ------------------------------------------------------
+# Admission control: τα βαριά queries (σαρώσεις του production, aggregations)
+# τρέχουν έως HEAVY_QUERIES ταυτόχρονα ανά process, με δίκαιη ουρά ανά
+# συνεδρία· τα ελαφριά (πίνακες αναφοράς) δεν περιμένουν ποτέ πίσω τους.
+# ------------------------------------------------------
+HEAVY_QUERIES = int(os.getenv("HEAVY_QUERIES", "4"))  # 0 = χωρίς όριο
+
+
+@functools.lru_cache(maxsize=256)
+def is_heavy(sql):
+    """Βαρύ query: διαβάζει το production ή κάνει aggregation (GROUP BY)."""
+    return "production" in tables(sql) or " GROUP BY " in sql_text(sql).upper()
+
+
+class Admission:
+    """Όριο ταυτόχρονων queries με δίκαιη ουρά: κάθε θέση που ελευθερώνεται
+    δίνεται εκ περιτροπής στις συνεδρίες που περιμένουν, ώστε μια συνεδρία
+    με πολλά queries να μην καθυστερεί όλες τις άλλες."""
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.running = 0
+        self._queues = OrderedDict()  # συνεδρία -> deque εισιτηρίων
+        self._granted = set()
+        self._cond = threading.Condition()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "slots": self.slots,
+                "running": self.running,
+                "waiting": sum(len(queue) for queue in self._queues.values()),
+            }
+
+    def position(self, owner):
+        """Θέση (1 = επόμενο) του πρώτου query της συνεδρίας στην ουρά, ή None."""
+        with self._cond:
+            return self._position(owner)
+
+    def _position(self, owner, ticket=None):
+        queue = self._queues.get(owner)
+        if not queue:
+            return None
+        index = 0 if ticket is None else queue.index(ticket)
+        # Στον γύρο i κάθε συνεδρία, με τη σειρά, παίρνει το i-οστό της query
+        ahead, before = 0, True
+        for other, other_queue in self._queues.items():
+            if other == owner:
+                before = False
+            ahead += min(len(other_queue), index)
+            if before and len(other_queue) > index:
+                ahead += 1
+        return ahead + 1
+
+    @contextmanager
+    def admit(self, owner, on_wait=None):
+        """Θέση για ένα query· το on_wait(θέση) καλείται σε κάθε αναμονή
+        (και μπορεί να τη διακόψει με exception)."""
+        with self._cond:
+            if self.running < self.slots and not self._queues:
+                self.running += 1
+            else:
+                ticket = object()
+                self._queues.setdefault(owner, deque()).append(ticket)
+                try:
+                    while ticket not in self._granted:
+                        if on_wait is not None:
+                            on_wait(self._position(owner, ticket))
+                        self._cond.wait(CANCEL_POLL)
+                except BaseException:
+                    if ticket in self._granted:
+                        self._granted.discard(ticket)
+                        self._release()
+                    else:
+                        queue = self._queues[owner]
+                        queue.remove(ticket)
+                        if not queue:
+                            del self._queues[owner]
+                    raise
+                self._granted.discard(ticket)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._release()
+
+    def _release(self):
+        self.running -= 1
+        while self.running < self.slots and self._queues:
+            owner, queue = next(iter(self._queues.items()))
+            self._granted.add(queue.popleft())
+            if queue:
+                self._queues.move_to_end(owner)
+            else:
+                del self._queues[owner]
+            self.running += 1
+        self._cond.notify_all()
+
+
+admission = Admission(HEAVY_QUERIES)
+
+# Ειδοποίηση για τη θέση στην ουρά (στο thread της σελίδας, βλ. queue_status)
+_on_queue = ContextVar("on_queue", default=None)
+
+
+@contextmanager
+def queue_status(callback):
+    """callback(θέση ή None) όσο τα queries της συνεδρίας περιμένουν στην ουρά."""
+    token = _on_queue.set(callback)
+    try:
+        yield
+    finally:
+        _on_queue.reset(token)
+
+
+@contextmanager
+def _admitted(sql):
+    if HEAVY_QUERIES <= 0 or not is_heavy(sql):
+        yield
+        return
+    run, owner = _current_caller()
+    notify = _on_queue.get()
+    shown = []
+
+    def on_wait(position):
+        if _superseded(run):
+            raise QueryCancelled()
+        if notify is not None and shown != [position]:
+            shown[:] = [position]
+            notify(position)
+
+    start = time.perf_counter()
+    with admission.admit(owner, on_wait):
+        instrument.add("queue_ms", (time.perf_counter() - start) * 1000)
+        if shown:
+            notify(None)
+        yield
+
+
+def _execute(sql, params, arrow=False):
+    if DATA_BACKEND == "parquet":
+        from data.snapshot import HANDLERS
+
+        handler = HANDLERS.get(sql)
+        # Queries χωρίς αντίστοιχο στο snapshot (π.χ. φυλές) πάνε στη βάση
+        if handler is not None:
+            df = handler(params or {})
+            return compact(df) if arrow else df
+    with _admitted(sql):
+        start = time.perf_counter()
+        with engine.connect() as conn, _server_timeout(conn), _cancellable(conn):
+            instrument.add("checkout_ms", (time.perf_counter() - start) * 1000)
+            if arrow:
+                return compact(pd.read_sql(sql, conn, params=params, dtype_backend="pyarrow"))
+            return pd.read_sql(sql, conn, params=params)
+
+
+def query_df(sql, params=None, cache=True, arrow=False):
+    """Εκτελεί SQL και επιστρέφει DataFrame, με Pandas + SQLAlchemy.
+
+    Με arrow=True το αποτέλεσμα είναι Arrow-backed με συμπαγείς τύπους
+    (βλ. data/frames.py): λιγότερη μνήμη στην cache και φθηνά αντίγραφα.
+    Με cache="disk" χρησιμοποιείται μόνο η cache του δίσκου (CACHE_DIR), για
+    αποτελέσματα που κρατιούνται ήδη αλλού στη μνήμη (π.χ. CellStore).
+    """
+    with instrument.track(sql, params) as record:
+        if not cache:
+            df = _execute(sql, params, arrow)
+            instrument.finish(record, df, "off")
+            return df
+        key = make_key(sql, params)
+        if arrow:
+            key += ("arrow",)
+        df, source = _single_flight(
+            key, lambda: _execute(sql, params, arrow), memory=cache != "disk"
+        )
+        instrument.finish(record, df, source)
+        return df
+
+
+def cached(key, compute):
+    """Αποτέλεσμα του compute() με την cache και το single-flight του query_df,
+    για αποτελέσματα που δεν είναι ένα απλό query (π.χ. από query_chunks)."""
+    return _single_flight(key, compute)[0]
+
+
+# ------------------------------------------------------
+# Single-flight: ίδιο query (SQL + params) που ήδη εκτελείται δεν ξαναστέλνεται·
+# οι επόμενοι callers περιμένουν το αποτέλεσμα του πρώτου. Πολλοί χρήστες
+# που ανοίγουν μαζί την ίδια αναφορά -> ένα query ανά διακριτό φίλτρο.
+# ------------------------------------------------------
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _single_flight(key, compute, memory=True):
+    """(DataFrame, "hit" | "disk" | "miss" | "shared")· με memory=False χωρίς
+    την cache της μνήμης."""
+    while True:
+        # Cache και queries σε εξέλιξη ελέγχονται μαζί: ένα query που μόλις
+        # ολοκληρώθηκε είναι ήδη στην cache πριν φύγει από το _inflight
+        with _inflight_lock:
+            df = result_cache.get(key) if memory else None
+            if df is not None:
+                return df, "hit"
+            future = _inflight.get(key)
+            leader = future is None
+            if leader:
+                future = _inflight[key] = Future()
+
+        if leader:
+            try:
+                generation = result_cache.generation
+                df, source = _load(key, compute, generation)
+                # Αν τα δεδομένα άλλαξαν όσο έτρεχε (invalidate), δεν αποθηκεύεται
+                if memory and result_cache.generation == generation:
+                    result_cache.set(key, df)
+            except BaseException as exc:
+                future.set_exception(exc)
+                raise
+            finally:
+                with _inflight_lock:
+                    del _inflight[key]
+            # Οι waiters αντιγράφουν από ιδιωτικό αντίγραφο, όχι από το df
+            # που επιστρέφεται στον εκτελούντα (και ίσως τροποποιείται)
+            future.set_result(df.copy())
+            return df, source
+
+        try:
+            # Αντίγραφο, όπως και από την cache: κάθε caller έχει το δικό του
+            return _wait(future).copy(), "shared"
+        except QueryCancelled:
+            # Ακυρώθηκε το run του caller που το εκτελούσε, όχι το δικό μας:
+            # ξανά, οπότε κάποιος από όσους περιμένουν γίνεται ο νέος εκτελών
+            if _superseded(_current_run()):
+                raise
+
+
+def _load(key, compute, generation):
+    """Από την cache του δίσκου ή με compute()· με το lock του δίσκου, το ίδιο
+    αποτέλεσμα υπολογίζεται από ένα μόνο process του host."""
+    if disk_cache is None:
+        return compute(), "miss"
+    run = _current_run()
+
+    def on_wait():
+        if _superseded(run):
+            raise QueryCancelled()
+
+    with disk_cache.lock(key, on_wait):
+        df = disk_cache.get(key)
+        if df is not None:
+            return df, "disk"
+        df = compute()
+        if result_cache.generation == generation:
+            disk_cache.set(key, df)
+        return df, "miss"
+
+
+def _wait(future):
+    """Αποτέλεσμα του query άλλου caller· η αναμονή σταματά αν αντικατασταθεί το run."""
+    run = _current_run()
+    while not future.done():
+        if _superseded(run):
+            raise QueryCancelled()
+        wait((future,), timeout=CANCEL_POLL)
+    return future.result()
+
+
+def query_chunks(sql, params=None, chunksize=50_000, arrow=True):
+    """Generator από DataFrames των chunksize γραμμών, για μεγάλες εξαγωγές:
+    οι γραμμές διαβάζονται σταδιακά από τη βάση (server-side cursor) και
+    δεν περνούν από την cache."""
+    with instrument.track(sql, params) as record:
+        record["rows"] = record["frame_bytes"] = 0
+        for chunk in _execute_chunks(sql, params, chunksize, arrow):
+            record["rows"] += len(chunk)
+            record["frame_bytes"] += frame_size(chunk)
+            yield chunk
+
+
+def _execute_chunks(sql, params, chunksize, arrow):
+    if DATA_BACKEND == "parquet":
+        from data.snapshot import HANDLERS
+
+        handler = HANDLERS.get(sql)
+        if handler is not None:
+            df = handler(params or {})
+            for start in range(0, len(df), chunksize):
+                chunk = df.iloc[start:start + chunksize]
+                yield compact(chunk) if arrow else chunk
+            return
+    with _admitted(sql):
+        start = time.perf_counter()
+        with engine.connect() as conn, _server_timeout(conn), _cancellable(conn):
+            instrument.add("checkout_ms", (time.perf_counter() - start) * 1000)
+            conn = conn.execution_options(stream_results=True)
+            kwargs = {"dtype_backend": "pyarrow"} if arrow else {}
+            for chunk in pd.read_sql(sql, conn, params=params, chunksize=chunksize, **kwargs):
+                yield compact(chunk) if arrow else chunk
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _pool_executor():
+    """Thread pool με όσα workers χωράει το connection pool του engine."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            pool = engine.pool
+            if isinstance(pool, QueuePool):
+                # max_overflow < 0: χωρίς όριο στο pool, αρκεί το pool_size
+                workers = pool.size() + max(pool._max_overflow, 0)
+            else:
+                # SingletonThreadPool: μία σύνδεση ανά thread, έως pool.size
+                workers = getattr(pool, "size", 5)
+            _executor = ThreadPoolExecutor(
+                max_workers=max(workers, 1), thread_name_prefix="query"
+            )
+    return _executor
+
+
+def query_many(batch, cache=True):
+    """Εκτελεί παράλληλα ένα σύνολο {όνομα: (sql, params)} και επιστρέφει
+    {όνομα: DataFrame}, όταν ολοκληρωθούν όλα."""
+    executor = _pool_executor()
+    caller = _current_caller()
+
+    def execute(sql, params):
+        token = _caller.set(caller)
+        try:
+            return query_df(sql, params, cache)
+        finally:
+            _caller.reset(token)
+
+    futures = {
+        name: executor.submit(execute, sql, params)
+        for name, (sql, params) in batch.items()
+    }
 
-def query_df(sql, params=None):
-    """Εκτελεί SQL και επιστρέφει DataFrame, με Pandas + SQLAlchemy."""
-    with engine.connect() as conn:
-        return pd.read_sql(sql, conn, params=params)
+    notify = _on_queue.get()
+    if notify is not None:
+        # Τα queries περιμένουν σε άλλα threads· η θέση της συνεδρίας στην
+        # ουρά ενημερώνεται από εδώ (το thread της σελίδας)
+        shown = None
+        while not all(future.done() for future in futures.values()):
+            wait(futures.values(), timeout=CANCEL_POLL)
+            position = admission.position(caller[1])
+            if position != shown:
+                shown = position
+                notify(position)
+    return {name: future.result() for name, future in futures.items()}
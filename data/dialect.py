@@ -0,0 +1,133 @@
+from sqlalchemy import BigInteger, Column, Float, Integer, MetaData, String, Table, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ClauseElement
+from sqlalchemy.sql.functions import GenericFunction
+
+# ------------------------------------------------------
+# Πίνακες και εκφράσεις SQLAlchemy Core για τα queries των αναφορών.
+# Μεταγλωττίζονται για τη διάλεκτο του engine (MariaDB, PostgreSQL,
+# SQLite, DuckDB), μαζί με το στυλ παραμέτρων (%(x)s, :x, $1).
+# ------------------------------------------------------
+metadata = MetaData()
+
+production_cube = Table(
+    "production_cube", metadata,
+    Column("breed_id", Integer),
+    Column("p_year", Integer),
+    Column("p_lact", Integer),
+    Column("birth_month", Integer),
+    Column("milk_class", Integer),
+    Column("fdays_bucket", Integer),
+    Column("n_rows", BigInteger),
+    Column("n_bdate", BigInteger),
+    Column("n_days", BigInteger),
+    Column("s_days", Float),
+    Column("q_days", Float),
+    Column("n_milk", BigInteger),
+    Column("s_milk", Float),
+    Column("q_milk", Float),
+    Column("n_births", BigInteger),
+    Column("s_births", Float),
+    Column("q_births", Float),
+)
+
+production_milk_hist = Table(
+    "production_milk_hist", metadata,
+    Column("breed_id", Integer),
+    Column("p_year", Integer),
+    Column("p_lact", Integer),
+    Column("milk_kg", Integer),
+    Column("n_rows", BigInteger),
+    Column("n_days", BigInteger),
+    Column("s_days", Float),
+    Column("q_days", Float),
+    Column("s_milk", Float),
+    Column("q_milk", Float),
+)
+
+production_sketch = Table(
+    "production_sketch", metadata,
+    Column("breed_id", Integer),
+    Column("p_year", Integer),
+    Column("p_lact", Integer),
+    Column("birth_month", Integer),
+    Column("fdays_bucket", Integer),
+    Column("measure", Integer),
+    Column("bucket", Integer),
+    Column("n", BigInteger),
+)
+
+production = Table(
+    "production", metadata,
+    Column("p_id", Integer),
+    Column("p_herd_id", Integer),
+    Column("p_year", Integer),
+    Column("p_lact", Integer),
+    Column("p_fdays", Integer),
+    Column("p_fmilk", Integer),
+)
+
+herds = Table(
+    "herds", metadata,
+    Column("h_id", Integer),
+    Column("h_breed_id", Integer),
+)
+
+breed = Table(
+    "breed", metadata,
+    Column("id", Integer),
+    Column("name", String(64)),
+)
+
+area = Table(
+    "area", metadata,
+    Column("ar_id", Integer),
+    Column("ar_name", String(64)),
+)
+
+
+class greatest(GenericFunction):
+    """GREATEST(a, b, ...)· στη SQLite το MAX με πολλά ορίσματα."""
+
+    type = Float()
+    inherit_cache = True
+
+
+@compiles(greatest, "sqlite")
+def _greatest_sqlite(element, compiler, **kw):
+    return "MAX(%s)" % compiler.process(element.clauses, **kw)
+
+
+def mean(measure):
+    """Μ.Ο. από τα αθροίσματα n_<measure>, s_<measure> του cube."""
+    c = production_cube.c
+    return func.sum(c["s_" + measure]) / _count(measure)
+
+
+def _count(measure):
+    # Float ώστε η διαίρεση να μη γίνεται NUMERIC / ακέραια σε καμία διάλεκτο
+    return func.nullif(func.sum(production_cube.c["n_" + measure]), 0, type_=Float)
+
+
+def std(measure):
+    """Τυπική απόκλιση πληθυσμού (όπως η STD της MariaDB) από n, sum, sum of squares."""
+    avg = mean(measure)
+    return func.sqrt(
+        greatest(func.sum(production_cube.c["q_" + measure]) / _count(measure) - avg * avg, 0)
+    )
+
+
+def is_query(value):
+    """Κείμενο SQL ή έκφραση Core (σταθερές των data/queries*)."""
+    return isinstance(value, (str, ClauseElement))
+
+
+def driver_sql(sql, params, dialect):
+    """(κείμενο, παράμετροι) για exec_driver_sql, π.χ. για EXPLAIN."""
+    if isinstance(sql, str):
+        return sql.strip().rstrip(";"), params or {}
+    compiled = sql.compile(dialect=dialect)
+    values = compiled.construct_params(params or {})
+    if compiled.positiontup:
+        return str(compiled), tuple(values[name] for name in compiled.positiontup)
+    return str(compiled), values
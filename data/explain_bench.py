@@ -0,0 +1,115 @@
+import argparse
+import json
+import re
+import statistics
+import time
+from datetime import datetime
+
+from sqlalchemy import inspect
+
+from data import queries, queries_lookup, queries_raw
+from data.db import engine
+from data.dialect import driver_sql
+
+# Queries που μετράμε: οι αρχικές αναφορές στο production, τα κελιά του cube
+# και οι πίνακες αναφοράς
+BENCH_QUERIES = {
+    **{name: getattr(queries_raw, name) for name in vars(queries_raw) if name.startswith("RAW_")},
+    **{name: getattr(queries, name) for name in vars(queries) if name.startswith("DATA_CELLS_")},
+    **{name: getattr(queries_lookup, name) for name in vars(queries_lookup) if name.startswith("LOOKUP_")},
+}
+
+
+def _denormalized(sql):
+    """Παραλλαγή αρχικής αναφοράς με τη στήλη p_breed_id αντί για JOIN με herds."""
+    sql = re.sub(r"(INNER )?JOIN herds ON production\.p_herd_id = herds\.h_id", "", sql)
+    return re.sub(r"(herds\.)?h_breed_id\s*=", "production.p_breed_id =", sql)
+
+
+def _explain(conn, sql, params):
+    statement, values = driver_sql(sql, params, conn.dialect)
+    result = conn.exec_driver_sql("EXPLAIN " + statement, values)
+    return [dict(row._mapping) for row in result]
+
+
+def _timings(conn, sql, params, repeat):
+    statement, values = driver_sql(sql, params, conn.dialect)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.exec_driver_sql(statement, values).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(label, breed, repeat=5):
+    """Καταγράφει EXPLAIN και χρόνους για κάθε query του BENCH_QUERIES."""
+    params = {
+        "breed": breed, "lact_from": 1, "lact_to": 15,
+        "year_from": 0, "year_to": 9999, "min_days": 90,
+    }
+    bench = dict(BENCH_QUERIES)
+    columns = {c["name"] for c in inspect(engine).get_columns("production")}
+    if "p_breed_id" in columns:
+        for name, sql in BENCH_QUERIES.items():
+            if name.startswith("RAW_"):
+                bench[name + "_DENORM"] = _denormalized(sql)
+
+    results = {}
+    with engine.connect() as conn:
+        for name, sql in bench.items():
+            timings = _timings(conn, sql, params, repeat)
+            results[name] = {
+                "median_ms": statistics.median(timings),
+                "timings_ms": timings,
+                "explain": _explain(conn, sql, params),
+            }
+            print(f"{name:<28}{results[name]['median_ms']:>10.1f} ms")
+    return {
+        "label": label,
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "breed": breed,
+        "queries": results,
+    }
+
+
+def compare(before, after):
+    """Πίνακας διαμέσων χρόνων δύο εκτελέσεων του run()."""
+    print(f"{'query':<28}{before['label']:>12}{after['label']:>12}{'x':>8}")
+    for name, b in before["queries"].items():
+        a = after["queries"].get(name)
+        if a is None:
+            continue
+        speedup = b["median_ms"] / a["median_ms"] if a["median_ms"] else float("inf")
+        print(f"{name:<28}{b['median_ms']:>12.1f}{a['median_ms']:>12.1f}{speedup:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="EXPLAIN και χρόνοι queries πριν / μετά τις μεταβολές σχήματος"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run")
+    run_parser.add_argument("label", help="π.χ. before / after")
+    run_parser.add_argument("--breed", type=int, default=2)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--out", help="αρχείο JSON (προεπιλογή: bench_<label>.json)")
+    cmp_parser = sub.add_parser("compare")
+    cmp_parser.add_argument("before")
+    cmp_parser.add_argument("after")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        result = run(args.label, args.breed, args.repeat)
+        with open(args.out or f"bench_{args.label}.json", "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2, default=str)
+    else:
+        with open(args.before, encoding="utf-8") as f:
+            before = json.load(f)
+        with open(args.after, encoding="utf-8") as f:
+            after = json.load(f)
+        compare(before, after)
+
+
+if __name__ == "__main__":
+    main()
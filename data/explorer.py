@@ -0,0 +1,102 @@
+import os
+from math import isqrt
+
+import numpy as np
+import pandas as pd
+
+# Μέγιστο πλήθος σημείων που στέλνονται στον browser ανά γράφημα
+MAX_POINTS = int(os.getenv("EXPLORER_MAX_POINTS", "20000"))
+
+# Κελιά ανά άξονα όταν το παράθυρο έχει περισσότερα σημεία· λιγότερα αν
+# τα DENSITY_BINS² κελιά ξεπερνούν το max_points (βλ. Lactations.view)
+DENSITY_BINS = 120
+
+
+class Lactations:
+    """Διάρκεια (ημέρες) και γαλακτοπαραγωγή (κιλά) ατομικών γαλακτικών περιόδων.
+
+    Φέρνονται μία φορά ανά φίλτρο (βλ. stats.lactations)· το view() δίνει για
+    το τρέχον παράθυρο το πολύ MAX_POINTS σημεία, ώστε ο όγκος προς τον browser
+    και ο χρόνος σχεδίασης να μην εξαρτώνται από το πλήθος των εγγραφών.
+    """
+
+    def __init__(self, days, milk):
+        self.days = days    # float32, ένα στοιχείο ανά γαλακτική περίοδο
+        self.milk = milk
+
+    @staticmethod
+    def frame(chunks):
+        """Chunks του DATA_RAW_LACTATIONS -> DataFrame δύο στηλών float32."""
+        days, milk = [np.empty(0, dtype=np.float32)], [np.empty(0, dtype=np.float32)]
+        for chunk in chunks:
+            days.append(chunk["days"].to_numpy(dtype=np.float32))
+            milk.append(chunk["milk_kg"].to_numpy(dtype=np.float32))
+        return pd.DataFrame({"days": np.concatenate(days), "milk_kg": np.concatenate(milk)})
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(
+            df["days"].to_numpy(dtype=np.float32),
+            df["milk_kg"].to_numpy(dtype=np.float32),
+        )
+
+    @property
+    def size(self):
+        return self.days.size
+
+    @property
+    def empty(self):
+        return self.size == 0
+
+    def bounds(self):
+        """((ελάχ., μέγ.) ημερών, (ελάχ., μέγ.) κιλών) όλων των εγγραφών."""
+        return (
+            (float(self.days.min()), float(self.days.max())),
+            (float(self.milk.min()), float(self.milk.max())),
+        )
+
+    def view(self, days_range=None, milk_range=None, max_points=MAX_POINTS, bins=DENSITY_BINS):
+        """(DataFrame days / milk_kg / n, binned) για το παράθυρο των αξόνων.
+
+        Αν το παράθυρο έχει έως max_points εγγραφές επιστρέφονται αυτούσιες
+        (n = 1)· αλλιώς χωρίζεται σε bins × bins κελιά και κάθε μη κενό κελί
+        δίνει ένα σημείο στο κέντρο βάρους του, με n το πλήθος των εγγραφών του.
+        Τα bins περιορίζονται ώστε bins² <= max_points.
+        """
+        (d_low, d_high), (m_low, m_high) = self._ranges(days_range, milk_range)
+        inside = (
+            (self.days >= d_low) & (self.days <= d_high)
+            & (self.milk >= m_low) & (self.milk <= m_high)
+        )
+        days, milk = self.days[inside], self.milk[inside]
+        if days.size <= max_points:
+            return pd.DataFrame({"days": days, "milk_kg": milk, "n": 1}), False
+
+        bins = max(1, min(bins, isqrt(max_points)))
+        x = _bin_index(days, d_low, d_high, bins)
+        y = _bin_index(milk, m_low, m_high, bins)
+        cell = x * bins + y
+        n = np.bincount(cell, minlength=bins * bins)
+        s_days = np.bincount(cell, weights=days, minlength=bins * bins)
+        s_milk = np.bincount(cell, weights=milk, minlength=bins * bins)
+        occupied = n > 0
+        n = n[occupied]
+        return pd.DataFrame({
+            "days": s_days[occupied] / n,
+            "milk_kg": s_milk[occupied] / n,
+            "n": n,
+        }), True
+
+    def _ranges(self, days_range, milk_range):
+        if self.empty:
+            return (0.0, 0.0), (0.0, 0.0)
+        full_days, full_milk = self.bounds()
+        return days_range or full_days, milk_range or full_milk
+
+
+def _bin_index(values, low, high, bins):
+    span = high - low
+    if span <= 0:
+        return np.zeros(values.size, dtype=np.int64)
+    index = ((values - low) / span * bins).astype(np.int64)
+    return np.clip(index, 0, bins - 1)
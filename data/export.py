@@ -0,0 +1,156 @@
+import argparse
+import importlib.util
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+
+from data import figures, lookups, stats
+from data.rollup import CLASS_WIDTH, floor_days
+from data.warmer import UNKNOWN_BREED
+
+# ------------------------------------------------------
+# Μαζική εξαγωγή των τεσσάρων αναφορών (πίνακες και γραφήματα των σελίδων)
+# για κάθε συνδυασμό φυλής / εύρους ετών / εύρους Γ.Π., σε HTML, PNG, CSV.
+# Τα δεδομένα όλων των φυλών φέρνονται μαζί (stats.prefetch), και η
+# σχεδίαση / εγγραφή των αρχείων γίνεται παράλληλα σε processes.
+# ------------------------------------------------------
+FORMATS = ("html", "png", "csv")
+
+# Αναφορά -> (τίτλος, γραφήματα από το figures)
+SECTIONS = {
+    "year": ("Στατιστικά ανά Παραγωγικό Έτος", lambda df: [
+        ("year", figures.year_chart(df)),
+        ("year_std_milk", figures.std_chart(df, "std_milk", "STD Γάλακτος", "blue")),
+        ("year_std_days", figures.std_chart(df, "std_days", "STD Ημερών", "orange")),
+        ("year_std_births", figures.std_chart(df, "std_births", "STD Γεννήσεων", "green")),
+    ]),
+    "totals": ("Συγκεντρωτικά Μεγέθη", lambda df: []),
+    "month": ("Στατιστικά ανά Μήνα Τοκετού", lambda df: [
+        ("month_milk", figures.error_bar_chart(df, "month_bdate", "Μήνας Τοκετού", "milk")),
+        ("month_days", figures.error_bar_chart(df, "month_bdate", "Μήνας Τοκετού", "days")),
+    ]),
+    "lact": ("Στατιστικά ανά Γαλακτική Περίοδο", lambda df: [
+        ("lact_milk", figures.error_bar_chart(df, "p_lact", "Γαλακτική Περίοδος", "milk")),
+        ("lact_days", figures.error_bar_chart(df, "p_lact", "Γαλακτική Περίοδος", "days")),
+    ]),
+    "class": ("Κλάσεις Γαλακτοπαραγωγής", lambda df: [
+        ("class", figures.class_chart(df)),
+    ]),
+}
+
+
+def _range(text):
+    """"2010-2015" -> (2010, 2015), "2012" -> (2012, 2012)."""
+    parts = [int(p) for p in text.split("-", 1)]
+    low, high = parts[0], parts[-1]
+    if low > high:
+        raise argparse.ArgumentTypeError(f"Μη έγκυρο εύρος: {text}")
+    return low, high
+
+
+def _slug(text):
+    return re.sub(r"[^\w]+", "_", str(text)).strip("_")
+
+
+def collect(breeds, years, lacts, min_days):
+    """Πίνακες όλων των συνδυασμών: [(φάκελος, {αναφορά: DataFrame}), ...].
+
+    Ένα σύνολο queries ανά (έτη, Γ.Π.) για όλες τις φυλές μαζί· οι αναφορές
+    ανά φυλή υπολογίζονται μετά από τα κελιά που έχουν ήδη φέρει.
+    """
+    names = {breed_id: name for name, breed_id in lookups.breeds().items()}
+    # Ίδια στρογγύλευση με τις σελίδες: ο πληθυσμός των αρχείων είναι ο ίδιος
+    min_days = floor_days(min_days)
+    jobs = []
+    for (year_from, year_to), (lact_from, lact_to) in product(years, lacts):
+        params = {
+            "lact_from": lact_from, "lact_to": lact_to,
+            "year_from": year_from, "year_to": year_to, "min_days": min_days,
+        }
+        stats.prefetch(breeds, **params)
+        histograms = stats.milk_histograms(breeds, **params)
+        for breed in breeds:
+            tables = {
+                name: stats.REPORTS[name].__wrapped__(breed=breed, **params)
+                for name in ("year", "totals", "month", "lact")
+            }
+            tables["class"] = histograms[breed].rebin(width=CLASS_WIDTH)
+            folder = os.path.join(
+                _slug(names.get(breed, breed)),
+                f"years_{year_from}-{year_to}_lact_{lact_from}-{lact_to}",
+            )
+            jobs.append((folder, tables))
+    return jobs
+
+
+def render(out, folder, tables, formats):
+    """Γράφει τα αρχεία ενός συνδυασμού (τρέχει σε process του pool)."""
+    path = os.path.join(out, folder)
+    os.makedirs(path, exist_ok=True)
+    html = []
+    plotlyjs = "cdn"  # το plotly.js φορτώνεται μία φορά ανά αρχείο
+    for name, df in tables.items():
+        title, charts = SECTIONS[name]
+        table = df.drop(columns=["left", "right", "mid"], errors="ignore")
+        if "csv" in formats:
+            table.to_csv(os.path.join(path, f"{name}.csv"), index=False)
+        html.append(f"<h2>{title}</h2>")
+        for chart, fig in charts(df) if not df.empty else []:
+            if "png" in formats:
+                fig.write_image(os.path.join(path, f"{chart}.png"), width=1000)
+            html.append(fig.to_html(full_html=False, include_plotlyjs=plotlyjs))
+            plotlyjs = False
+        html.append(table.to_html(index=False, float_format=lambda v: f"{v:.2f}", na_rep=""))
+    if "html" in formats:
+        with open(os.path.join(path, "report.html"), "w", encoding="utf-8") as f:
+            f.write(
+                "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+                f"<title>{folder}</title></head><body>"
+                + "\n".join(html)
+                + "</body></html>"
+            )
+    return folder
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Μαζική εξαγωγή αναφορών")
+    parser.add_argument("--breeds", type=int, nargs="+",
+                        help="ids φυλών (προεπιλογή: όλες εκτός της Άγνωστης)")
+    parser.add_argument("--years", type=_range, nargs="+",
+                        help="εύρη ετών, π.χ. 2010-2015 2016-2024 (προεπιλογή: όλα)")
+    parser.add_argument("--lacts", type=_range, nargs="+", default=[(1, 15)],
+                        help="εύρη Γ.Π., π.χ. 1 2-15 (προεπιλογή: 1-15)")
+    parser.add_argument("--min-days", type=int, default=90,
+                        help="διάρκεια γαλ/γής ≥ ημέρες (στρογγυλεύεται όπως στις σελίδες)")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=["html", "csv"])
+    parser.add_argument("--out", default="export")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if "png" in args.formats and importlib.util.find_spec("kaleido") is None:
+        parser.error("Η εξαγωγή PNG χρειάζεται το πακέτο kaleido (pip install kaleido).")
+
+    breeds = args.breeds or [b for b in lookups.breeds().values() if b != UNKNOWN_BREED]
+    years = args.years or [(lookups.years()[0], lookups.years()[-1])]
+
+    if floor_days(args.min_days) != args.min_days:
+        print(f"--min-days {args.min_days} -> {floor_days(args.min_days)} (κάδος διάρκειας του cube)")
+
+    start = time.perf_counter()
+    jobs = collect(breeds, years, args.lacts, args.min_days)
+    print(f"Δεδομένα {len(jobs)} συνδυασμών σε {time.perf_counter() - start:.1f} δευτ.")
+
+    with ProcessPoolExecutor(args.processes) as pool:
+        futures = [
+            pool.submit(render, args.out, folder, tables, args.formats)
+            for folder, tables in jobs
+        ]
+        for future in as_completed(futures):
+            print(future.result())
+    print(f"Ολοκληρώθηκε σε {time.perf_counter() - start:.1f} δευτ. ({args.out})")
+
+
+if __name__ == "__main__":
+    main()
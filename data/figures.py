@@ -0,0 +1,329 @@
+import functools
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from data.cache import frame_hash
+
+# ------------------------------------------------------
+# Γραφήματα των σελίδων, από το DataFrame του αποτελέσματος.
+# Κάθε figure κρατιέται (LRU) με κλειδί το hash των δεδομένων και των
+# επιλογών, οπότε ένα rerun με ίδια δεδομένα δεν το ξαναχτίζει. Οι αριθμοί
+# στρογγυλεύονται στα δεκαδικά της εμφάνισης και στέλνονται ως float32,
+# άρα το JSON προς τον browser είναι περίπου μισό.
+# ------------------------------------------------------
+FIGURE_CACHE_SIZE = 128
+
+DECIMALS = 2
+
+_figures = OrderedDict()
+_lock = threading.Lock()
+
+
+def _memoized(fn):
+    @functools.wraps(fn)
+    def wrapper(df, *args, **kwargs):
+        key = (fn.__name__, frame_hash(df), args, tuple(sorted(kwargs.items())))
+        with _lock:
+            fig = _figures.get(key)
+            if fig is not None:
+                _figures.move_to_end(key)
+                return fig
+        fig = fn(df, *args, **kwargs)
+        with _lock:
+            _figures[key] = fig
+            while len(_figures) > FIGURE_CACHE_SIZE:
+                _figures.popitem(last=False)
+        return fig
+    return wrapper
+
+
+def clear():
+    with _lock:
+        _figures.clear()
+
+
+def _trim(values):
+    """Αριθμοί για το payload: DECIMALS δεκαδικά, float32 (NULL -> NaN)."""
+    values = pd.Series(values).to_numpy(dtype=float, na_value=np.nan)
+    return np.round(values, DECIMALS).astype(np.float32)
+
+
+# ------------------------------------------------------
+# Ανά έτος: Μ.Ο. γάλακτος / διάρκειας σε δύο άξονες Y
+# ------------------------------------------------------
+@_memoized
+def year_chart(df, quantiles=False):
+    fig = go.Figure()
+
+    # Γραμμή 1 - Μέση Γαλακτοπαραγωγή (αριστερός άξονας)
+    fig.add_trace(
+        go.Scatter(
+            x=df["p_year"],
+            y=_trim(df["avg_milk"]),
+            mode="lines+markers",
+            name="Μέση Γαλ/γή (κιλά)",
+            line=dict(color="blue", width=3),
+            hovertemplate=(
+                "<b>Έτος</b>: %{x}<br>"
+                "<b>Μέση Γαλ/γή</b>: %{y:.2f} κιλά<extra></extra>"
+            ),
+            yaxis="y"
+        )
+    )
+
+    # Γραμμή 2 - Μέση Διάρκεια Γαλ/γής (δεξιός άξονας)
+    fig.add_trace(
+        go.Scatter(
+            x=df["p_year"],
+            y=_trim(df["avg_days"]),
+            mode="lines+markers",
+            name="Μέση Διάρκεια Γαλ/γής (ημέρες)",
+            line=dict(color="orange", width=3),
+            hovertemplate=(
+                "<b>Έτος</b>: %{x}<br>"
+                "<b>Μέση Διάρκεια</b>: %{y:.2f} ημέρες<extra></extra>"
+            ),
+            yaxis="y2"
+        )
+    )
+
+    # Διάμεσοι (διακεκομμένες γραμμές), αν ζητήθηκαν
+    if quantiles:
+        for measure, name, unit, color, axis in (
+            ("milk", "Διάμεσος Γαλ/γής", "κιλά", "blue", "y"),
+            ("days", "Διάμεσος Διάρκειας", "ημέρες", "orange", "y2"),
+        ):
+            fig.add_trace(
+                go.Scatter(
+                    x=df["p_year"],
+                    y=_trim(df[f"p50_{measure}"]),
+                    mode="lines",
+                    name=f"{name} ({unit})",
+                    line=dict(color=color, width=2, dash="dash"),
+                    customdata=np.column_stack(
+                        [_trim(df[f"p10_{measure}"]), _trim(df[f"p90_{measure}"])]
+                    ),
+                    hovertemplate=(
+                        f"<b>{name}</b>: %{{y:.2f}} {unit} "
+                        "(p10 %{customdata[0]:.2f} – p90 %{customdata[1]:.2f})<extra></extra>"
+                    ),
+                    yaxis=axis
+                )
+            )
+
+    # Ρυθμίσεις layout με δύο άξονες Y
+    fig.update_layout(
+        height=500,
+        hovermode="x unified",
+        xaxis=dict(
+            title="Έτος"
+        ),
+        yaxis=dict(
+            title="Μέση Γαλ/γή (κιλά)",
+            side="left"
+        ),
+        yaxis2=dict(
+            title="Μέση Διάρκεια Γαλ/γής (ημέρες)",
+            side="right",
+            overlaying="y"
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="top",
+            y=-0.2,
+            xanchor="center",
+            x=0.5,
+            title_text=""
+        )
+    )
+    return fig
+
+
+@_memoized
+def std_chart(df, column, title, color):
+    """Μικρό γράφημα τυπικής απόκλισης ανά έτος."""
+    fig = go.Figure()
+    fig.add_trace(
+        go.Scatter(
+            x=df["p_year"],
+            y=_trim(df[column]),
+            mode="lines+markers",
+            name=title,
+            line=dict(color=color, width=2),
+            hovertemplate=
+            "<b>Έτος</b>: %{x}<br>" +
+            f"<b>{title}</b>: %{{y:.2f}}<extra></extra>"
+        )
+    )
+    fig.update_layout(
+        height=250,
+        margin=dict(l=20, r=20, t=30, b=20),
+        xaxis_title="Έτος",
+        yaxis_title=title
+    )
+    return fig
+
+
+# ------------------------------------------------------
+# Ανά μήνα / Γ.Π.: Μ.Ο. ± τυπική απόκλιση (και p10 – p50 – p90)
+# ------------------------------------------------------
+_MEASURES = {
+    # μέτρο: (όνομα, τίτλος άξονα Y, χρώμα Μ.Ο., χρώμα διαμέσου)
+    "milk": ("Avg Milk (kg)", "Μ.Ο. Γαλ/γής (kg)", "#4DA6FF", "#1F3B73"),
+    "days": ("Avg Duration (days)", "Μ.Ο. Διάρκεια (ημέρες)", "#FFB347", "#B35900"),
+}
+
+
+@_memoized
+def error_bar_chart(df, key, key_title, measure, quantiles=False):
+    name, y_title, color, median_color = _MEASURES[measure]
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Scatter(
+            x=df[key],
+            y=_trim(df[f"avg_{measure}"]),
+            mode="markers",           # Μόνο σημεία (Χωρίς γραμμή)
+            name=name,
+            error_y=dict(
+                type="data",
+                array=_trim(df[f"std_{measure}"]),
+                visible=True
+            ),
+            marker=dict(
+                size=10,
+                symbol="circle",
+                color=color
+            )
+        )
+    )
+
+    fig.update_layout(
+        xaxis_title=key_title,
+        yaxis_title=y_title,
+        showlegend=False,
+        height=500,
+        margin=dict(l=70, r=40, t=40, b=60)
+    )
+    fig.update_xaxes(dtick=1)
+    fig.update_yaxes(hoverformat=".2f")
+
+    if quantiles:
+        p10, p50, p90 = (_trim(df[f"p{p}_{measure}"]) for p in (10, 50, 90))
+        fig.add_trace(
+            go.Scatter(
+                x=df[key],
+                y=p50,
+                mode="markers",
+                name="Διάμεσος (p10 – p90)",
+                error_y=dict(
+                    type="data",
+                    symmetric=False,
+                    array=p90 - p50,
+                    arrayminus=p50 - p10,
+                    visible=True
+                ),
+                marker=dict(
+                    size=9,
+                    symbol="diamond",
+                    color=median_color
+                )
+            )
+        )
+        fig.update_layout(showlegend=True)
+    return fig
+
+
+# ------------------------------------------------------
+# Κλάσεις γαλακτοπαραγωγής: μπάρες + πραγματική κατανομή + ιδανική Gauss
+# ------------------------------------------------------
+@_memoized
+def class_chart(df, quantiles=()):
+    """quantiles: ζεύγη (q, κιλά) που σημειώνονται με κάθετες γραμμές."""
+    # Βασικά δεδομένα: αριθμητικά όρια / μέσα κλάσεων
+    class_labels = df["class_range"]
+    counts = df["total_animals"].to_numpy()
+    midpoints = _trim(df["mid"])
+    widths = _trim(df["right"] - df["left"])
+
+    fig = go.Figure()
+
+    # 1. Bars
+    fig.add_trace(go.Bar(
+        x=midpoints,
+        y=counts,
+        width=widths * 0.9,
+        name="Ζώα",
+        marker=dict(color="#762124")
+    ))
+
+    # 2. πραγματική κατανομή
+    fig.add_trace(go.Scatter(
+        x=midpoints,
+        y=counts,
+        mode="lines+markers",
+        name="Πραγματική Κατανομή",
+        line=dict(color="blue", width=2, shape="spline")
+    ))
+
+    # 3. Ιδανική Gauss
+    if len(midpoints) > 1 and counts.max() > 0:
+        # Midpoint της κλάσης με το max πλήθος
+        peak_midpoint = midpoints[np.argmax(counts)]
+
+        # Weighted std
+        variance = np.average((midpoints - peak_midpoint) ** 2, weights=counts)
+        std_x = math.sqrt(variance)
+
+        # Ομαλό x-range
+        x_smooth = np.linspace(midpoints.min(), midpoints.max(), 300)
+
+        # Gauss centered at peak
+        gauss_raw = np.exp(-0.5 * ((x_smooth - peak_midpoint) / std_x) ** 2)
+
+        # Scale ώστε peak(Y) = max(counts)
+        gauss_scaled = gauss_raw * (counts.max() / gauss_raw.max())
+
+        # Ιδανική καμπύλη Gauss
+        fig.add_trace(go.Scatter(
+            x=_trim(x_smooth),
+            y=_trim(gauss_scaled),
+            mode="lines",
+            name="Ιδανική Καμπύλη Gauss",
+            hoverinfo="skip",  # no hover
+            line=dict(color="green", width=3, shape="spline")
+        ))
+
+    # 4. Εκατοστημόρια γαλακτοπαραγωγής
+    for q, value in quantiles:
+        fig.add_vline(
+            x=value,
+            line=dict(color="gray", width=1, dash="dot"),
+            annotation_text=f"p{round(q * 100)}"
+        )
+
+    # Layout
+    fig.update_layout(
+        template="plotly_white",
+        xaxis=dict(
+            title="Κλάση Γαλακτοπαραγωγής",
+            tickmode="array",
+            tickvals=midpoints.tolist(),
+            ticktext=class_labels.tolist()
+        ),
+        yaxis_title="Πλήθος Ζώων",
+        height=450,
+        legend=dict(
+            orientation="h",
+            yanchor="top",
+            y=-0.25,
+            xanchor="center",
+            x=0.5
+        )
+    )
+    return fig
@@ -0,0 +1,161 @@
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+from data import lookups, stats
+from data.db import CACHE_TTL, queue_status, result_cache
+from data.rollup import FDAYS_BUCKET, floor_days
+
+# ------------------------------------------------------
+# Κοινά φίλτρα των σελίδων: η επιλογή κρατιέται στο st.session_state,
+# οπότε η μετάβαση από σελίδα σε σελίδα δεν τη χάνει.
+# ------------------------------------------------------
+STATE_KEY = "filters"
+
+# Πόσα αποτελέσματα αναφορών κρατά κάθε συνεδρία (βλ. report)
+SESSION_RESULTS = 32
+
+LACTS = list(range(1, 16))
+
+
+def _saved():
+    return st.session_state.setdefault(STATE_KEY, {})
+
+
+def _widget(widget, name, label, options=None, default=None, normalize=None, **kwargs):
+    """Widget με key filter_<name>. Η τιμή του ενός widget δεν περνά σε
+    άλλη σελίδα, οπότε κρατιέται στο STATE_KEY (on_change) και δίνεται
+    ξανά στο widget πριν εμφανιστεί.
+
+    normalize: διόρθωση της τιμής που έδωσε ο χρήστης, πάνω στο ίδιο το
+    widget (εφαρμόζεται στο on_change, πριν από το script run).
+    """
+    key = f"filter_{name}"
+    saved = _saved()
+    if name in saved and (options is None or saved[name] in options):
+        st.session_state[key] = saved[name]
+    else:
+        st.session_state.pop(key, None)
+        if default is not None and options is not None:
+            kwargs["index"] = options.index(default)
+        elif default is not None:
+            kwargs["value"] = default
+
+    def keep():
+        if normalize is not None:
+            st.session_state[key] = normalize(st.session_state[key])
+        saved[name] = st.session_state[key]
+
+    args = (label, options) if options is not None else (label,)
+    value = widget(*args, key=key, on_change=keep, **kwargs)
+    saved[name] = value
+    return value
+
+
+def breed():
+    """Επιλογή φυλής· επιστρέφει το id της."""
+    options = lookups.breeds()
+    name = _widget(st.selectbox, "breed", "Επιλογή Φυλής", list(options.keys()))
+    return options[name]
+
+
+def lact_from():
+    return _widget(st.selectbox, "lact_from", "Γαλ. περίοδος Από", LACTS, LACTS[0])
+
+
+def lact_to():
+    return _widget(st.selectbox, "lact_to", "Γαλ. περίοδος Έως", LACTS, LACTS[-1])
+
+
+def _years():
+    """Τα παραγωγικά έτη· χωρίς κανένα η σελίδα σταματά με μήνυμα."""
+    years = list(lookups.years())
+    if not years:
+        st.warning("Δεν υπάρχουν ακόμη παραγωγικά έτη στα δεδομένα.")
+        st.stop()
+    return years
+
+
+def year_from():
+    years = _years()
+    return _widget(st.selectbox, "year_from", "Επιλογή Έτους Από", years, years[0])
+
+
+def year_to():
+    years = _years()
+    # -> τελευταία (μέγιστη)
+    return _widget(st.selectbox, "year_to", "Επιλογή Έτους Έως", years, years[-1])
+
+
+def min_days():
+    """Διάρκεια γαλ/γής ≥ X ημέρες. Το cube απαντά μόνο σε αρχές κάδων
+    διάρκειας, οπότε άλλη τιμή διορθώνεται στο widget (data/rollup.floor_days)
+    και εμφανίζεται το όριο που εφαρμόστηκε."""
+    snapped = f"{STATE_KEY}_min_days_snapped"
+
+    def snap(days):
+        if floor_days(days) != days:
+            st.session_state[snapped] = days
+        return floor_days(days)
+
+    value = _widget(
+        st.number_input, "min_days", "Διάρκεια γαλ/γής ≥ (ημέρες)",
+        default=90,
+        min_value=0,
+        max_value=365,
+        step=FDAYS_BUCKET,
+        normalize=snap,
+        help=f"Πολλαπλάσιο των {FDAYS_BUCKET} ημερών (κάδος διάρκειας των αναφορών)."
+    )
+    typed = st.session_state.pop(snapped, None)
+    if typed is not None:
+        st.caption(f"{typed} → {value} ημέρες: το όριο στρογγυλεύεται στους κάδους των {FDAYS_BUCKET} ημερών.")
+    return value
+
+
+def quantiles(help):
+    """Εκατοστημόρια (p10 / p50 / p90), προαιρετικά."""
+    return _widget(st.checkbox, "quantiles", "Εκατοστημόρια (p10 / p50 / p90)", help=help)
+
+
+# ------------------------------------------------------
+# Αποτελέσματα αναφορών ανά συνεδρία: επιστροφή σε σελίδα / φίλτρα
+# που έχουν ήδη εμφανιστεί δεν ξαναρωτά ούτε την κοινή cache
+# ------------------------------------------------------
+RESULTS_KEY = "results"
+
+
+def report(name, **params):
+    """Αποτέλεσμα της αναφοράς stats.REPORTS[name] για τα params.
+
+    Κρατιέται στη συνεδρία έως CACHE_TTL δευτ. και μέχρι την επόμενη
+    φόρτωση δεδομένων (result_cache.generation)· τα αποτελέσματα δεν
+    πρέπει να τροποποιούνται επιτόπου.
+    """
+    store = st.session_state.setdefault(RESULTS_KEY, OrderedDict())
+    key = (name, tuple(sorted(params.items())))
+    entry = store.get(key)
+    if entry is not None:
+        expires, generation, value = entry
+        if expires >= time.monotonic() and generation == result_cache.generation:
+            store.move_to_end(key)
+            return value
+    generation = result_cache.generation
+    # Υπό φόρτο τα βαριά queries μπαίνουν σε ουρά (data/db.py)· η θέση φαίνεται εδώ
+    slot = st.empty()
+
+    def queued(position):
+        if position is None:
+            slot.empty()
+        else:
+            slot.info(f"Η βάση είναι απασχολημένη· η αναφορά είναι {position}η στην ουρά.")
+
+    with queue_status(queued):
+        value = stats.REPORTS[name](**params)
+    slot.empty()
+    store[key] = (time.monotonic() + CACHE_TTL, generation, value)
+    store.move_to_end(key)
+    while len(store) > SESSION_RESULTS:
+        store.popitem(last=False)
+    return value
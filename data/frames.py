@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Στήλες κειμένου με διακριτές τιμές έως αυτό το ποσοστό των γραμμών
+# αποθηκεύονται ως κατηγορικές (π.χ. ονόματα φυλών / περιοχών)
+CATEGORY_RATIO = 0.5
+
+_INTEGER_TYPES = [pa.int8(), pa.int16(), pa.int32()]
+
+
+def compact(df):
+    """Arrow-backed DataFrame με τους μικρότερους τύπους που χωρούν τις τιμές:
+    ακέραιοι int8 / int16 / int32, decimal -> float64, επαναλαμβανόμενα
+    κείμενα -> category. Οι στήλες Arrow δεν αντιγράφονται στο copy()."""
+    if not all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes):
+        df = df.convert_dtypes(dtype_backend="pyarrow")
+    return pd.DataFrame(
+        {name: _compact_column(column) for name, column in df.items()},
+        index=df.index,
+    )
+
+
+def _compact_column(column):
+    dtype = column.dtype
+    if not isinstance(dtype, pd.ArrowDtype):
+        return column
+    arrow_type = dtype.pyarrow_dtype
+
+    if pa.types.is_decimal(arrow_type):
+        return column.astype(pd.ArrowDtype(pa.float64()))
+
+    if pa.types.is_integer(arrow_type) and column.notna().any():
+        low, high = column.min(), column.max()
+        for candidate in _INTEGER_TYPES:
+            if candidate.bit_width >= arrow_type.bit_width:
+                break
+            info = np.iinfo(candidate.to_pandas_dtype())
+            if info.min <= low and high <= info.max:
+                return column.astype(pd.ArrowDtype(candidate))
+        return column
+
+    if (pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)) and len(column):
+        if column.nunique() <= CATEGORY_RATIO * len(column):
+            return column.astype("category")
+    return column
+
+
+def display(df, decimals=2):
+    """Μορφοποίηση για το st.dataframe: οι δεκαδικοί στρογγυλεύονται μόνο
+    στην εμφάνιση, χωρίς αντίγραφο (.round) του DataFrame."""
+    return df.style.format(precision=decimals, na_rep="")
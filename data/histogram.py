@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# Στήλες του DATA_MILK_HIST (αθροίσματα ανά 1 κιλό γάλακτος)
+SUMS = ["n_rows", "n_days", "s_days", "q_days", "s_milk", "q_milk"]
+
+
+class MilkHistogram:
+    """Κατανομή γαλακτοπαραγωγής ανά 1 κιλό για ένα φίλτρο φυλής / Γ.Π. / ετών.
+
+    Φέρνεται μία φορά από τη βάση (βλ. stats.milk_histogram)· κλάσεις
+    οποιουδήποτε πλάτους ή με δικά τους όρια υπολογίζονται εδώ, χωρίς νέο
+    query. Κάθε κιλό [k, k+1) ανήκει στην κλάση που περιέχει το k.
+    """
+
+    def __init__(self, kg, sums):
+        self.kg = kg        # ταξινομημένα κιλά (FLOOR(p_fmilk / 1000))
+        self.sums = sums    # στήλη του SUMS -> πίνακας, ένα στοιχείο ανά κιλό
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(
+            df["milk_kg"].to_numpy(dtype=np.int64),
+            {name: df[name].to_numpy(dtype=float) for name in SUMS},
+        )
+
+    @property
+    def empty(self):
+        return self.kg.size == 0
+
+    def quantile(self, q):
+        """q-εκατοστημόριο της γαλακτοπαραγωγής (κιλά), με ακρίβεια 1 κιλού."""
+        counts = self.sums["n_rows"]
+        if self.empty or counts.sum() == 0:
+            return None
+        cumulative = np.cumsum(counts)
+        i = int(np.searchsorted(cumulative, q * (cumulative[-1] - 1), side="right"))
+        return self.kg[i] + 0.5
+
+    def edges(self, width):
+        """Όρια κλάσεων πλάτους width κιλών που καλύπτουν όλη την κατανομή."""
+        if self.empty:
+            return np.array([0.0, float(width)])
+        low = np.floor(self.kg.min() / width) * width
+        high = (np.floor(self.kg.max() / width) + 1) * width
+        return low + width * np.arange(round((high - low) / width) + 1)
+
+    def rebin(self, width=None, edges=None):
+        """DataFrame με μία γραμμή ανά κλάση [left, right): αριθμητικά όρια,
+        μέσο, ετικέτα, πλήθος ζώων και Μ.Ο. / τυπική απόκλιση.
+
+        Δίνεται είτε width (κιλά) είτε αύξουσα λίστα edges.
+        """
+        edges = np.asarray(self.edges(width) if edges is None else edges, dtype=float)
+        bins = len(edges) - 1
+        idx = np.searchsorted(edges, self.kg, side="right") - 1
+        inside = (idx >= 0) & (idx < bins)
+        idx = idx[inside]
+        totals = {
+            name: np.bincount(idx, weights=values[inside], minlength=bins)
+            for name, values in self.sums.items()
+        }
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n, n_days = totals["n_rows"], totals["n_days"]
+            avg_days = np.where(n_days > 0, totals["s_days"] / n_days, np.nan)
+            avg_milk = np.where(n > 0, totals["s_milk"] / n, np.nan)
+            std_milk = np.where(
+                n > 0,
+                np.sqrt(np.maximum(totals["q_milk"] / n - avg_milk ** 2, 0)),
+                np.nan,
+            )
+
+        left, right = edges[:-1], edges[1:]
+        return pd.DataFrame({
+            "left": left,
+            "right": right,
+            "mid": (left + right) / 2,
+            "class_range": [f"{a + 1:g} - {b:g}" for a, b in zip(left, right)],
+            "total_animals": n.astype(np.int64),
+            "avg_days": avg_days,
+            "avg_milk_kg": avg_milk,
+            "std_milk_kg": std_milk,
+        })
@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from sqlalchemy import event
+
+from data.cache import frame_size
+from data.dialect import driver_sql, is_query
+
+log = logging.getLogger(__name__)
+
+QUERY_LOG = os.getenv("QUERY_LOG", "")             # αρχείο JSON lines ("" = όχι)
+QUERY_LOG_SIZE = int(os.getenv("QUERY_LOG_SIZE", "1000"))
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "1000"))
+
+# Τελευταίες εκτελέσεις (για τη σελίδα διαγνωστικών)
+records = deque(maxlen=QUERY_LOG_SIZE)
+
+# Πόσες φορές ζητήθηκε κάθε (αναφορά, φίλτρα) – για τον warmer
+usage = Counter()
+
+_current = ContextVar("query_record", default=None)
+_log_lock = threading.Lock()
+_names = {}
+_engine = None
+
+
+def query_name(sql):
+    """Όνομα σταθεράς (π.χ. DATA_PRODUCTION) για ένα SQL των data/queries*."""
+    if not _names:
+        from data import queries, queries_lookup, queries_raw
+
+        for module in (queries, queries_lookup, queries_raw):
+            for name, value in vars(module).items():
+                if name.isupper() and is_query(value):
+                    _names.setdefault(value, name)
+    return _names.get(sql, "ad-hoc")
+
+
+def install(engine):
+    """Συνδέει τα event hooks του SQLAlchemy στο engine."""
+    global _engine
+    _engine = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        record = _current.get()
+        if record is None:
+            return
+        start = conn.info.pop("query_start", time.perf_counter())
+        record["exec_ms"] += (time.perf_counter() - start) * 1000
+
+
+def add(field, value):
+    """Προσθέτει χρόνο / τιμή στην εγγραφή του τρέχοντος query (αν υπάρχει)."""
+    record = _current.get()
+    if record is not None:
+        record[field] = record.get(field, 0) + value
+
+
+@contextmanager
+def track(sql, params):
+    """Καταγράφει μία κλήση του query_df· ο caller καλεί finish() με το αποτέλεσμα."""
+    record = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "name": query_name(sql),
+        "params": {k: _plain(v) for k, v in (params or {}).items()},
+        "cache": "off",
+        "queue_ms": 0.0,
+        "checkout_ms": 0.0,
+        "exec_ms": 0.0,
+        "frame_ms": 0.0,
+        "total_ms": 0.0,
+        "rows": None,
+        "frame_bytes": None,  # μέγεθος του DataFrame στη μνήμη (όχι bytes δικτύου)
+        "slow": False,
+        "explain": None,
+        "error": None,
+    }
+    token = _current.set(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as exc:  # και QueryCancelled (διακοπή από rerun)
+        record["error"] = repr(exc)
+        raise
+    finally:
+        _current.reset(token)
+        record["total_ms"] = (time.perf_counter() - start) * 1000
+        if record["cache"] not in ("hit", "shared"):
+            record["frame_ms"] = max(
+                record["total_ms"] - record["queue_ms"] - record["checkout_ms"]
+                - record["exec_ms"], 0.0
+            )
+        record["slow"] = (
+            record["total_ms"] >= SLOW_QUERY_MS and record["cache"] not in ("hit", "shared")
+        )
+        _store(record, sql, params)
+
+
+def record_usage(report, params):
+    """Καταγράφει ότι ζητήθηκε μια αναφορά με συγκεκριμένα φίλτρα."""
+    params = {k: _plain(v) for k, v in params.items()}
+    usage[(report, tuple(sorted(params.items())))] += 1
+    if QUERY_LOG:
+        _write({
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "usage": report,
+            "params": params,
+        })
+
+
+def logged_usage():
+    """Μετρητής χρήσης από το QUERY_LOG (επιβιώνει από επανεκκινήσεις)."""
+    counts = Counter()
+    if not QUERY_LOG or not os.path.exists(QUERY_LOG):
+        return counts
+    with _log_lock, open(QUERY_LOG, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "usage" in entry:
+                counts[(entry["usage"], tuple(sorted(entry["params"].items())))] += 1
+    return counts
+
+
+def finish(record, df, cache):
+    record["cache"] = cache
+    record["rows"] = len(df)
+    record["frame_bytes"] = frame_size(df)
+
+
+def _plain(value):
+    return value.item() if hasattr(value, "item") else value
+
+
+def _store(record, sql, params):
+    records.append(record)
+    if record["slow"] and _engine is not None and record["exec_ms"] > 0:
+        threading.Thread(
+            target=_explain, args=(record, sql, params), daemon=True
+        ).start()
+    elif QUERY_LOG:
+        _write(record)
+
+
+def _explain(record, sql, params):
+    # Το EXPLAIN τρέχει σε ξεχωριστή σύνδεση ώστε να μην καθυστερεί τη σελίδα
+    try:
+        with _engine.connect() as conn:
+            statement, values = driver_sql(sql, params, _engine.dialect)
+            result = conn.exec_driver_sql("EXPLAIN " + statement, values)
+            record["explain"] = [dict(row._mapping) for row in result]
+    except Exception as exc:
+        record["explain"] = [{"error": repr(exc)}]
+    if QUERY_LOG:
+        _write(record)
+
+
+def _write(record):
+    try:
+        with _log_lock, open(QUERY_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    except OSError:
+        log.exception("Αποτυχία εγγραφής στο %s", QUERY_LOG)
@@ -0,0 +1,92 @@
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+
+from data.db import query_many
+from data.queries_lookup import LOOKUP_AREAS, LOOKUP_BREEDS, LOOKUP_LACTS, LOOKUP_YEARS
+
+log = logging.getLogger(__name__)
+
+LOOKUP_REFRESH = int(os.getenv("LOOKUP_REFRESH", "3600"))
+
+
+class LookupRegistry:
+    """Φορτώνει τους πίνακες αναφοράς μία φορά ανά process και τους
+    ανανεώνει περιοδικά στο παρασκήνιο."""
+
+    def __init__(self, interval=LOOKUP_REFRESH):
+        self.interval = interval
+        self._data = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def load(self):
+        """Διαβάζει ξανά όλους τους πίνακες και αντικαθιστά τα δεδομένα ατομικά."""
+        frames = query_many({
+            "breeds": (LOOKUP_BREEDS, None),
+            "years": (LOOKUP_YEARS, None),
+            "areas": (LOOKUP_AREAS, None),
+            "lacts": (LOOKUP_LACTS, None),
+        }, cache=False)
+        breeds_df, years_df = frames["breeds"], frames["years"]
+        areas_df, lacts_df = frames["areas"], frames["lacts"]
+
+        self._data = {
+            "breeds": MappingProxyType(
+                dict(zip(breeds_df["name"], breeds_df["id"].astype(int).tolist()))
+            ),
+            "years": tuple(years_df["p_year"].astype(int).tolist()),
+            "lacts": tuple(lacts_df["p_lact"].astype(int).tolist()),
+            "areas": MappingProxyType(
+                dict(zip(areas_df["ar_name"], areas_df["ar_id"].astype(int).tolist()))
+            ),
+        }
+
+    def get(self, name):
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self.load()
+                self._start()
+        return self._data[name]
+
+    def _start(self):
+        if self._thread is None and self.interval > 0:
+            self._thread = threading.Thread(
+                target=self._run, name="lookup-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.load()
+            except Exception:
+                # Κρατάμε τα προηγούμενα δεδομένα αν αποτύχει η ανανέωση
+                log.exception("Αποτυχία ανανέωσης πινάκων αναφοράς")
+
+
+registry = LookupRegistry()
+
+
+def breeds():
+    """Φυλές: όνομα -> id."""
+    return registry.get("breeds")
+
+
+def years():
+    """Παραγωγικά έτη σε αύξουσα σειρά."""
+    return registry.get("years")
+
+
+def lacts():
+    """Γαλακτικές περίοδοι που υπάρχουν στα δεδομένα, σε αύξουσα σειρά."""
+    return registry.get("lacts")
+
+
+def areas():
+    """Περιοχές: όνομα -> id."""
+    return registry.get("areas")
@@ -0,0 +1,113 @@
+import argparse
+
+from sqlalchemy import text
+
+from data.db import engine
+
+# ------------------------------------------------------
+# Μεταβολές σχήματος με τη σειρά εφαρμογής: (id, περιγραφή, προαιρετική, statements).
+# Οι εφαρμοσμένες καταγράφονται στον πίνακα schema_migrations.
+# ------------------------------------------------------
+MIGRATIONS = [
+    (
+        "001_herds_breed",
+        "Ευρετήριο φυλής στα κοπάδια για το JOIN / φίλτρο h_breed_id",
+        False,
+        ["CREATE INDEX IF NOT EXISTS idx_herds_breed ON herds (h_breed_id, h_id)"],
+    ),
+    (
+        "002_production_report",
+        "Covering ευρετήριο των αναφορών (και του rebuild του cube) στο production",
+        False,
+        ["""
+CREATE INDEX IF NOT EXISTS idx_production_report ON production (
+    p_herd_id, p_lact, p_year, p_fdays, p_fmilk, p_bdate, p_males, p_females
+)
+"""],
+    ),
+    (
+        "003_production_year",
+        "Ευρετήριο ετών για το DISTINCT p_year",
+        False,
+        ["CREATE INDEX IF NOT EXISTS idx_production_year ON production (p_year)"],
+    ),
+    (
+        "005_production_breed",
+        "Αποκανονικοποιημένη φυλή στο production (χωρίς JOIN με herds), "
+        "συγχρονισμένη με triggers",
+        True,
+        [
+            "ALTER TABLE production ADD COLUMN IF NOT EXISTS p_breed_id INT NULL",
+            """
+CREATE OR REPLACE TRIGGER production_breed_ins BEFORE INSERT ON production
+FOR EACH ROW SET NEW.p_breed_id = (SELECT h_breed_id FROM herds WHERE h_id = NEW.p_herd_id)
+""",
+            """
+CREATE OR REPLACE TRIGGER production_breed_upd BEFORE UPDATE ON production
+FOR EACH ROW SET NEW.p_breed_id = (SELECT h_breed_id FROM herds WHERE h_id = NEW.p_herd_id)
+""",
+            """
+CREATE OR REPLACE TRIGGER herds_breed_upd AFTER UPDATE ON herds
+FOR EACH ROW
+    UPDATE production SET p_breed_id = NEW.h_breed_id
+    WHERE p_herd_id = NEW.h_id AND NOT (NEW.h_breed_id <=> OLD.h_breed_id)
+""",
+            """
+UPDATE production
+JOIN herds ON production.p_herd_id = herds.h_id
+SET production.p_breed_id = herds.h_breed_id
+""",
+            """
+CREATE INDEX IF NOT EXISTS idx_production_breed ON production (
+    p_breed_id, p_lact, p_year, p_fdays, p_fmilk, p_bdate, p_males, p_females
+)
+""",
+        ],
+    ),
+]
+
+MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    id          VARCHAR(64) PRIMARY KEY,
+    applied_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def applied():
+    """Τα id των μεταβολών που έχουν ήδη εφαρμοστεί."""
+    with engine.begin() as conn:
+        conn.execute(text(MIGRATIONS_DDL))
+        return {row[0] for row in conn.execute(text("SELECT id FROM schema_migrations"))}
+
+
+def migrate(optional=False, dry_run=False):
+    """Εφαρμόζει με τη σειρά όσες μεταβολές λείπουν."""
+    done = applied()
+    for migration_id, description, is_optional, statements in MIGRATIONS:
+        if migration_id in done or (is_optional and not optional):
+            continue
+        print(f"{migration_id}: {description}")
+        if dry_run:
+            continue
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+            conn.execute(
+                text("INSERT INTO schema_migrations (id) VALUES (:id)"),
+                {"id": migration_id},
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Μεταβολές σχήματος της βάσης")
+    parser.add_argument("--with-denormalized", action="store_true",
+                        help="εφαρμογή και της προαιρετικής στήλης p_breed_id")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="μόνο εμφάνιση των μεταβολών που λείπουν")
+    args = parser.parse_args()
+    migrate(optional=args.with_denormalized, dry_run=args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
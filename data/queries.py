@@ -1,95 +1,191 @@
-DATA_PRODUCTION = """
-SELECT 
-    p_year,
-    AVG(p_fdays) AS avg_days,
-    AVG(p_fmilk/1000) AS avg_milk,
-    STD(p_fmilk/1000) AS std_milk,
-    STD(p_fdays) AS std_days,
-    STD(p_males + p_females) AS std_births,
-    COUNT(p_bdate) AS count_births,
-    AVG(p_males + p_females) AS avg_births
-FROM production 
-JOIN herds ON production.p_herd_id = herds.h_id
-WHERE 1=1
-  AND herds.h_breed_id = %(breed)s
-  AND production.p_lact BETWEEN %(lact_from)s AND %(lact_to)s
-  AND production.p_fdays >= %(min_days)s
-GROUP BY p_year
-ORDER BY p_year;
-"""
-
-DATA_PRODUCTION_TOTAL = """
-SELECT 
-    AVG(p_fdays) AS avg_days,
-    AVG(p_fmilk/1000) AS avg_milk,
-    STD(p_fmilk/1000) AS std_milk,
-    STD(p_fdays) AS std_days,
-    STD(p_males + p_females) AS std_births,
-    COUNT(p_bdate) AS total_births,
-    AVG(p_males + p_females) AS avg_poly,
-    COUNT(DISTINCT p_year) AS total_years
-FROM production 
-JOIN herds ON production.p_herd_id = herds.h_id
-WHERE herds.h_breed_id = %(breed)s
-  AND production.p_lact BETWEEN %(lact_from)s AND %(lact_to)s
-  AND production.p_fdays >= %(min_days)s;
-"""
-
-DATA_CLASSIFICATION="""
-SELECT
-    FLOOR(p_fmilk / 50000) AS class_no,
-    CONCAT(
-        FLOOR(p_fmilk / 50000) * 50 + 1, ' - ',
-        (FLOOR(p_fmilk / 50000) + 1) * 50
-    ) AS class_range,
-    COUNT(*) AS total_animals,
-    AVG(p_fdays) AS avg_days,
-    AVG(p_fmilk / 1000) AS avg_milk_kg,
-    STD(p_fmilk / 1000) AS std_milk_kg
-FROM production
-JOIN herds ON production.p_herd_id = herds.h_id
-WHERE herds.h_breed_id = %(breed)s
-  AND p_fmilk IS NOT NULL
-  AND p_lact BETWEEN %(lact_from)s AND %(lact_to)s
-  AND p_year BETWEEN %(year_from)s AND %(year_to)s
-GROUP BY class_no
-ORDER BY class_no;
-"""
-
-DATA_PRODUCTION_MONTH="""
-SELECT 
-    month(p_bdate) AS month_bdate,
-    Avg(p_fdays) AS avg_days,
-    Avg(p_fmilk/1000) AS avg_milk,
-    StD(p_fmilk/1000) AS std_milk,
-    StD(p_fdays) AS std_days, 
-    StD(p_males+p_females) AS std_births,
-    Count(p_bdate) AS count_births,
-    Avg(p_males+p_females) AS avg_births
-FROM production INNER JOIN herds ON production.p_herd_id = herds.h_id 
-WHERE 1=1 
-    AND production.p_lact BETWEEN %(lact_from)s AND %(lact_to)s
-    AND p_year BETWEEN %(year_from)s AND %(year_to)s
-    AND h_breed_id=%(breed)s  
-GROUP BY month(p_bdate)
-"""
-
-DATA_PRODUCTION_LACT = """
-SELECT 
-    p_lact,
-    AVG(p_fdays) AS avg_days,
-    AVG(p_fmilk/1000) AS avg_milk,
-    STD(p_fmilk/1000) AS std_milk,
-    STD(p_fdays) AS std_days,
-    STD(p_males + p_females) AS std_births,
-    COUNT(p_bdate) AS count_births,
-    AVG(p_males + p_females) AS avg_births
-FROM production 
-JOIN herds ON production.p_herd_id = herds.h_id
-WHERE 1=1
-  AND herds.h_breed_id = %(breed)s
-  AND p_year BETWEEN %(year_from)s AND %(year_to)s
-  AND production.p_fdays >= %(min_days)s
-GROUP BY p_lact
-ORDER BY p_lact;
-"""
+# Οι αναφορές διαβάζουν από το production_cube (βλ. data/rollup.py).
+# Μ.Ο. και τυπικές αποκλίσεις (πληθυσμού, όπως η STD της MariaDB)
+# υπολογίζονται ακριβώς από τα αθροίσματα n, sum, sum of squares.
+# Ορίζονται ως εκφράσεις SQLAlchemy Core (βλ. data/dialect.py), ώστε να
+# τρέχουν σε MariaDB, PostgreSQL, SQLite και DuckDB.
+from sqlalchemy import BigInteger, Float, String, bindparam, cast, func, select
+
+from data.dialect import (
+    herds,
+    mean,
+    production,
+    production_cube as cube,
+    production_milk_hist as hist,
+    production_sketch as sketch,
+    std,
+)
+
+c = cube.c
+
+_breed = c.breed_id == bindparam("breed")
+_lacts = c.p_lact.between(bindparam("lact_from"), bindparam("lact_to"))
+_years = c.p_year.between(bindparam("year_from"), bindparam("year_to"))
+_min_days = c.fdays_bucket >= bindparam("min_days")
+
+
+def _report_columns():
+    return [
+        mean("days").label("avg_days"),
+        mean("milk").label("avg_milk"),
+        std("milk").label("std_milk"),
+        std("days").label("std_days"),
+        std("births").label("std_births"),
+        cast(func.sum(c.n_bdate), BigInteger).label("count_births"),
+        mean("births").label("avg_births"),
+    ]
+
+
+def _report(group, label, *where):
+    return (
+        select(func.nullif(group, 0).label(label), *_report_columns())
+        .where(_breed, *where)
+        .group_by(group)
+        .order_by(group)
+    )
+
+
+DATA_PRODUCTION = _report(c.p_year, "p_year", _lacts, _min_days)
+
+DATA_PRODUCTION_TOTAL = select(
+    mean("days").label("avg_days"),
+    mean("milk").label("avg_milk"),
+    std("milk").label("std_milk"),
+    std("days").label("std_days"),
+    std("births").label("std_births"),
+    cast(func.coalesce(func.sum(c.n_bdate), 0), BigInteger).label("total_births"),
+    mean("births").label("avg_poly"),
+    func.count(func.nullif(c.p_year, 0).distinct()).label("total_years"),
+).where(_breed, _lacts, _min_days)
+
+DATA_CLASSIFICATION = (
+    select(
+        c.milk_class.label("class_no"),
+        (
+            cast(c.milk_class * 50 + 1, String) + " - "
+            + cast((c.milk_class + 1) * 50, String)
+        ).label("class_range"),
+        cast(func.sum(c.n_rows), BigInteger).label("total_animals"),
+        mean("days").label("avg_days"),
+        mean("milk").label("avg_milk_kg"),
+        std("milk").label("std_milk_kg"),
+    )
+    .where(_breed, c.milk_class >= 0, _lacts, _years)
+    .group_by(c.milk_class)
+    .order_by(c.milk_class)
+)
+
+DATA_PRODUCTION_MONTH = _report(c.birth_month, "month_bdate", _lacts, _years)
+
+DATA_PRODUCTION_LACT = _report(c.p_lact, "p_lact", _years, _min_days)
+
+
+# ------------------------------------------------------
+# Κελιά ανά (ομάδα, έτος, Γ.Π.) για τη μηχανή συγχώνευσης (data/stats.py)
+# ------------------------------------------------------
+_cell_sums = [
+    "n_rows", "n_bdate",
+    "n_days", "s_days", "q_days",
+    "n_milk", "s_milk", "q_milk",
+    "n_births", "s_births", "q_births",
+]
+
+
+def _cells_query(group, *extra, by_breed=False):
+    # by_breed: πολλές φυλές σε ένα query (παράμετρος breeds), με στήλη breed_id
+    breed = c.breed_id.in_(bindparam("breeds", expanding=True)) if by_breed else _breed
+    keys = [c.breed_id] if by_breed else []
+    return (
+        select(
+            *keys,
+            group.label("grp"),
+            c.p_year,
+            c.p_lact,
+            *(func.sum(c[name]).label(name) for name in _cell_sums),
+        )
+        .where(breed, _years, _lacts, _min_days, *extra)
+        .group_by(*keys, group, c.p_year, c.p_lact)
+    )
+
+
+DATA_CELLS_YEAR = _cells_query(c.p_year)
+DATA_CELLS_MONTH = _cells_query(c.birth_month)
+DATA_CELLS_LACT = _cells_query(c.p_lact)
+DATA_CELLS_CLASS = _cells_query(c.milk_class, c.milk_class >= 0)
+
+# Τα ίδια για πολλές φυλές μαζί (μαζική εξαγωγή, data/export.py)
+DATA_BREEDS_CELLS_YEAR = _cells_query(c.p_year, by_breed=True)
+DATA_BREEDS_CELLS_MONTH = _cells_query(c.birth_month, by_breed=True)
+DATA_BREEDS_CELLS_LACT = _cells_query(c.p_lact, by_breed=True)
+DATA_BREEDS_CELLS_CLASS = _cells_query(c.milk_class, c.milk_class >= 0, by_breed=True)
+
+
+# ------------------------------------------------------
+# Κάδοι των quantile sketches ανά ομάδα (data/sketch.py), συγχωνευμένοι στη
+# βάση για όλο το εύρος των φίλτρων: μία γραμμή ανά (ομάδα, μέτρο, κάδο)
+# ------------------------------------------------------
+def _sketch_query(group, *where):
+    k = sketch.c
+    return (
+        select(k[group].label("grp"), k.measure, k.bucket, func.sum(k.n).label("n"))
+        .where(k.breed_id == bindparam("breed"), *where)
+        .group_by(k[group], k.measure, k.bucket)
+    )
+
+
+_sketch_years = sketch.c.p_year.between(bindparam("year_from"), bindparam("year_to"))
+_sketch_lacts = sketch.c.p_lact.between(bindparam("lact_from"), bindparam("lact_to"))
+_sketch_min_days = sketch.c.fdays_bucket >= bindparam("min_days")
+
+DATA_SKETCH_YEAR = _sketch_query("p_year", _sketch_lacts, _sketch_min_days)
+DATA_SKETCH_MONTH = _sketch_query("birth_month", _sketch_years, _sketch_lacts)
+DATA_SKETCH_LACT = _sketch_query("p_lact", _sketch_years, _sketch_min_days)
+
+
+# ------------------------------------------------------
+# Κατανομή γαλακτοπαραγωγής ανά 1 κιλό για το data/histogram.py
+# ------------------------------------------------------
+def _milk_hist_query(by_breed=False):
+    h = hist.c
+    if by_breed:
+        breed, keys = h.breed_id.in_(bindparam("breeds", expanding=True)), [h.breed_id]
+    else:
+        breed, keys = h.breed_id == bindparam("breed"), []
+    return (
+        select(
+            *keys,
+            h.milk_kg,
+            *(func.sum(h[name]).label(name)
+              for name in ("n_rows", "n_days", "s_days", "q_days", "s_milk", "q_milk")),
+        )
+        .where(
+            breed,
+            h.p_lact.between(bindparam("lact_from"), bindparam("lact_to")),
+            h.p_year.between(bindparam("year_from"), bindparam("year_to")),
+        )
+        .group_by(*keys, h.milk_kg)
+        .order_by(*keys, h.milk_kg)
+    )
+
+
+DATA_MILK_HIST = _milk_hist_query()
+DATA_BREEDS_MILK_HIST = _milk_hist_query(by_breed=True)
+
+
+# ------------------------------------------------------
+# Ατομικές γαλακτικές περίοδοι για τον explorer (data/explorer.py)·
+# διαβάζονται σε chunks με το db.query_chunks
+# ------------------------------------------------------
+DATA_RAW_LACTATIONS = (
+    select(
+        production.c.p_fdays.label("days"),
+        (cast(production.c.p_fmilk, Float) / 1000).label("milk_kg"),
+    )
+    .select_from(production.join(herds, production.c.p_herd_id == herds.c.h_id))
+    .where(
+        herds.c.h_breed_id == bindparam("breed"),
+        production.c.p_lact.between(bindparam("lact_from"), bindparam("lact_to")),
+        production.c.p_year.between(bindparam("year_from"), bindparam("year_to")),
+        production.c.p_fdays.is_not(None),
+        production.c.p_fmilk.is_not(None),
+    )
+)
@@ -1,18 +1,21 @@
-LOOKUP_AREAS = """
-SELECT ar_id, ar_name
-FROM area
-ORDER BY ar_name;
-"""
+from sqlalchemy import select
 
-LOOKUP_YEARS = """
-SELECT DISTINCT p_year
-FROM production
-WHERE p_year IS NOT NULL
-ORDER BY p_year;
-"""
+from data.dialect import area, breed, production_cube as cube
 
-LOOKUP_BREEDS = """
-SELECT id, name
-FROM breed
-ORDER BY name;
-"""
+LOOKUP_AREAS = select(area.c.ar_id, area.c.ar_name).order_by(area.c.ar_name)
+
+LOOKUP_YEARS = (
+    select(cube.c.p_year)
+    .distinct()
+    .where(cube.c.p_year > 0)
+    .order_by(cube.c.p_year)
+)
+
+LOOKUP_BREEDS = select(breed.c.id, breed.c.name).order_by(breed.c.name)
+
+LOOKUP_LACTS = (
+    select(cube.c.p_lact)
+    .distinct()
+    .where(cube.c.p_lact > 0)
+    .order_by(cube.c.p_lact)
+)
@@ -0,0 +1,323 @@
+import argparse
+
+from sqlalchemy import text
+
+from data import rollup
+from data.db import engine
+from data.rollup import cell_dimensions, milk_hist_dimensions, sketch_dimensions, sketch_select
+
+# ------------------------------------------------------
+# Ημερολόγιο αλλαγών του production (γεμίζει από triggers).
+# Κάθε αλλαγή γράφεται ως +1 (νέα τιμή) και / ή -1 (παλιά τιμή),
+# ώστε διαγραφές και διορθώσεις να αφαιρούνται από τα κελιά του cube.
+# Η φυλή γράφεται τη στιγμή της αλλαγής: όταν ένα κοπάδι αλλάζει φυλή,
+# οι εγγραφές του αφαιρούνται από την παλιά και προστίθενται στη νέα.
+# ------------------------------------------------------
+CHANGES_DDL = """
+CREATE TABLE IF NOT EXISTS production_changes (
+    id          BIGINT AUTO_INCREMENT PRIMARY KEY,
+    batch       BIGINT,  -- ενημέρωση που την εφάρμοσε (NULL = εκκρεμεί)
+    sign        TINYINT NOT NULL,
+    p_breed_id  INT,  -- φυλή του κοπαδιού (0 = χωρίς φυλή, NULL = χωρίς κοπάδι)
+    p_herd_id   INT,
+    p_year      SMALLINT,
+    p_lact      SMALLINT,
+    p_bdate     DATE,
+    p_fdays     INT,
+    p_fmilk     INT,
+    p_males     INT,
+    p_females   INT,
+    changed_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_changes_batch (batch)
+)
+"""
+
+# Για ημερολόγια από παλαιότερη έκδοση (μετά: --install --full)
+CHANGES_UPGRADE = [
+    "ALTER TABLE production_changes ADD COLUMN IF NOT EXISTS batch BIGINT AFTER id",
+    "ALTER TABLE production_changes ADD COLUMN IF NOT EXISTS p_breed_id INT AFTER sign",
+    "CREATE INDEX IF NOT EXISTS idx_changes_batch ON production_changes (batch)",
+]
+
+# last_id: η τελευταία ενημέρωση (batch) που εφαρμόστηκε στο cube
+WATERMARK_DDL = """
+CREATE TABLE IF NOT EXISTS cube_watermark (
+    name        VARCHAR(64) PRIMARY KEY,
+    last_id     BIGINT NOT NULL,
+    updated_at  TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+)
+"""
+
+_COLUMNS = "p_herd_id, p_year, p_lact, p_bdate, p_fdays, p_fmilk, p_males, p_females"
+
+
+def _log_row(sign, row):
+    values = ", ".join(f"{row}.{c.strip()}" for c in _COLUMNS.split(","))
+    breed = f"(SELECT COALESCE(h_breed_id, 0) FROM herds WHERE h_id = {row}.p_herd_id)"
+    return (
+        f"INSERT INTO production_changes (sign, p_breed_id, {_COLUMNS}) "
+        f"VALUES ({sign}, {breed}, {values})"
+    )
+
+
+def _log_herd(sign, herd, breed_row):
+    """Όλες οι εγγραφές του κοπαδιού herd.h_id, με τη φυλή του breed_row."""
+    return (
+        f"INSERT INTO production_changes (sign, p_breed_id, {_COLUMNS}) "
+        f"SELECT {sign}, COALESCE({breed_row}.h_breed_id, 0), {_COLUMNS} "
+        f"FROM production WHERE p_herd_id = {herd}.h_id"
+    )
+
+
+TRIGGERS = [
+    f"""
+CREATE OR REPLACE TRIGGER production_changes_ins AFTER INSERT ON production
+FOR EACH ROW {_log_row(1, "NEW")}
+""",
+    f"""
+CREATE OR REPLACE TRIGGER production_changes_upd AFTER UPDATE ON production
+FOR EACH ROW BEGIN
+    {_log_row(-1, "OLD")};
+    {_log_row(1, "NEW")};
+END
+""",
+    f"""
+CREATE OR REPLACE TRIGGER production_changes_del AFTER DELETE ON production
+FOR EACH ROW {_log_row(-1, "OLD")}
+""",
+    f"""
+CREATE OR REPLACE TRIGGER herds_changes_ins AFTER INSERT ON herds
+FOR EACH ROW {_log_herd(1, "NEW", "NEW")}
+""",
+    f"""
+CREATE OR REPLACE TRIGGER herds_changes_upd AFTER UPDATE ON herds
+FOR EACH ROW BEGIN
+    IF NOT (NEW.h_breed_id <=> OLD.h_breed_id) THEN
+        {_log_herd(-1, "NEW", "OLD")};
+        {_log_herd(1, "NEW", "NEW")};
+    END IF;
+END
+""",
+    f"""
+CREATE OR REPLACE TRIGGER herds_changes_del AFTER DELETE ON herds
+FOR EACH ROW {_log_herd(-1, "OLD", "OLD")}
+""",
+]
+
+# Οι αλλαγές της ενημέρωσης :batch, με τη φυλή που γράφτηκε μαζί
+# τους (όχι την τρέχουσα του herds)· χωρίς κοπάδι δεν μετρούν, όπως στο JOIN
+# του rollup
+_SOURCE = "production_changes AS production"
+_BREED = "production.p_breed_id"
+_PENDING = (
+    "production.batch = :batch AND production.p_breed_id IS NOT NULL"
+)
+
+# Πρόσθεση (με πρόσημο) των αλλαγών στα κελιά του cube
+CUBE_FOLD = f"""
+INSERT INTO production_cube
+SELECT
+    {cell_dimensions(_BREED)},
+    SUM(sign),
+    SUM(sign * (p_bdate IS NOT NULL)),
+    SUM(sign * (p_fdays IS NOT NULL)),
+    SUM(sign * COALESCE(p_fdays, 0)),
+    SUM(sign * COALESCE(p_fdays * p_fdays, 0)),
+    SUM(sign * (p_fmilk IS NOT NULL)),
+    SUM(sign * COALESCE(p_fmilk / 1000, 0)),
+    SUM(sign * COALESCE(POW(p_fmilk / 1000, 2), 0)),
+    SUM(sign * (p_males + p_females IS NOT NULL)),
+    SUM(sign * COALESCE(p_males + p_females, 0)),
+    SUM(sign * COALESCE(POW(p_males + p_females, 2), 0))
+FROM {_SOURCE}
+WHERE {_PENDING}
+GROUP BY 1, 2, 3, 4, 5, 6
+ON DUPLICATE KEY UPDATE
+    n_rows = n_rows + VALUES(n_rows),
+    n_bdate = n_bdate + VALUES(n_bdate),
+    n_days = n_days + VALUES(n_days),
+    s_days = s_days + VALUES(s_days),
+    q_days = q_days + VALUES(q_days),
+    n_milk = n_milk + VALUES(n_milk),
+    s_milk = s_milk + VALUES(s_milk),
+    q_milk = q_milk + VALUES(q_milk),
+    n_births = n_births + VALUES(n_births),
+    s_births = s_births + VALUES(s_births),
+    q_births = q_births + VALUES(q_births)
+"""
+
+# Το ίδιο για την κατανομή ανά κιλό (production_milk_hist)
+MILK_HIST_FOLD = f"""
+INSERT INTO production_milk_hist
+SELECT
+    {milk_hist_dimensions(_BREED)},
+    SUM(sign),
+    SUM(sign * (p_fdays IS NOT NULL)),
+    SUM(sign * COALESCE(p_fdays, 0)),
+    SUM(sign * COALESCE(p_fdays * p_fdays, 0)),
+    SUM(sign * p_fmilk / 1000),
+    SUM(sign * POW(p_fmilk / 1000, 2))
+FROM {_SOURCE}
+WHERE {_PENDING}
+  AND production.p_fmilk IS NOT NULL
+GROUP BY 1, 2, 3, 4
+ON DUPLICATE KEY UPDATE
+    n_rows = n_rows + VALUES(n_rows),
+    n_days = n_days + VALUES(n_days),
+    s_days = s_days + VALUES(s_days),
+    q_days = q_days + VALUES(q_days),
+    s_milk = s_milk + VALUES(s_milk),
+    q_milk = q_milk + VALUES(q_milk)
+"""
+
+# Και για τους κάδους των quantile sketches (ένα statement ανά μέτρο)
+SKETCH_FOLDS = [
+    "INSERT INTO production_sketch"
+    + sketch_select(
+        measure,
+        source=_SOURCE,
+        count="SUM(sign)",
+        where=f"AND {_PENDING}",
+        breed=_BREED,
+    )
+    + "ON DUPLICATE KEY UPDATE n = n + VALUES(n)"
+    for measure in ("milk", "days")
+]
+
+_CELL_KEYS = "breed_id, p_year, p_lact, birth_month, milk_class, fdays_bucket"
+
+
+def _cleanup(table, keys, dimensions, count, where=""):
+    """Διαγραφή των κελιών που άδειασαν, μόνο ανάμεσα σε όσα άγγιξαν οι
+    αλλαγές (αναζήτηση με το πρωτεύον κλειδί, όχι σάρωση του πίνακα)."""
+    return f"""
+DELETE {table} FROM {table}
+JOIN (
+    SELECT DISTINCT {dimensions}
+    FROM {_SOURCE}
+    WHERE {_PENDING} {where}
+) AS touched USING ({keys})
+WHERE {table}.{count} <= 0
+"""
+
+
+# Κελιά που άδειασαν από διαγραφές / διορθώσεις
+CLEANUPS = [
+    _cleanup("production_cube", _CELL_KEYS, cell_dimensions(_BREED), "n_rows"),
+    _cleanup(
+        "production_milk_hist", "breed_id, p_year, p_lact, milk_kg",
+        milk_hist_dimensions(_BREED), "n_rows", "AND production.p_fmilk IS NOT NULL",
+    ),
+    _cleanup(
+        "production_sketch", "breed_id, p_year, p_lact, birth_month, fdays_bucket",
+        sketch_dimensions(_BREED), "n",
+    ),
+]
+
+
+def install():
+    """Δημιουργεί ημερολόγιο αλλαγών, watermark και triggers (μία φορά)."""
+    with engine.begin() as conn:
+        conn.execute(text(CHANGES_DDL))
+        for statement in CHANGES_UPGRADE:
+            conn.execute(text(statement))
+        conn.execute(text(WATERMARK_DDL))
+        for trigger in TRIGGERS:
+            conn.execute(text(trigger))
+
+
+def _set_watermark(conn, batch):
+    conn.execute(
+        text(
+            "INSERT INTO cube_watermark (name, last_id) VALUES ('production_cube', :id) "
+            "ON DUPLICATE KEY UPDATE last_id = VALUES(last_id)"
+        ),
+        {"id": batch},
+    )
+
+
+def _claim(conn, batch):
+    """Σημειώνει με το batch όσες αλλαγές εκκρεμούν και έχουν γίνει commit·
+    επιστρέφει πόσες. Μια συναλλαγή που γίνεται commit αργότερα, ακόμη και
+    με μικρότερο id, μένει NULL για την επόμενη ενημέρωση (ένα watermark
+    στο MAX(id) θα την προσπερνούσε για πάντα)."""
+    return conn.execute(
+        text("UPDATE production_changes SET batch = :batch WHERE batch IS NULL"),
+        {"batch": batch},
+    ).rowcount
+
+
+def _next_batch(conn):
+    last = conn.execute(
+        text(
+            "SELECT last_id FROM cube_watermark "
+            "WHERE name = 'production_cube' FOR UPDATE"
+        )
+    ).scalar()
+    return None if last is None else last + 1
+
+
+def full():
+    """Πλήρες rebuild· οι αλλαγές που εκκρεμούν σημειώνονται ως εφαρμοσμένες
+    στην ίδια συναλλαγή με το INSERT."""
+    def mark(conn):
+        batch = _next_batch(conn) or 1
+        _claim(conn, batch)
+        _set_watermark(conn, batch)
+
+    rollup.rebuild(before_build=mark)
+
+
+def incremental(purge=True):
+    """Προσθέτει στο cube (και στην κατανομή ανά κιλό) μόνο τις αλλαγές που
+    δεν έχουν εφαρμοστεί.
+
+    Επιστρέφει το πλήθος των εγγραφών του ημερολογίου που εφαρμόστηκαν.
+    """
+    with engine.begin() as conn:
+        batch = _next_batch(conn)
+        if batch is None:
+            raise RuntimeError("Δεν υπάρχει watermark· τρέξτε πρώτα --full.")
+
+        applied = _claim(conn, batch)
+        if not applied:
+            return 0
+
+        params = {"batch": batch}
+        conn.execute(text(CUBE_FOLD), params)
+        conn.execute(text(MILK_HIST_FOLD), params)
+        for fold in SKETCH_FOLDS:
+            conn.execute(text(fold), params)
+        for cleanup in CLEANUPS:
+            conn.execute(text(cleanup), params)
+        _set_watermark(conn, batch)
+        if purge:
+            conn.execute(
+                text("DELETE FROM production_changes WHERE batch <= :batch"), params
+            )
+    return applied
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Επαυξητική ενημέρωση του production_cube"
+    )
+    parser.add_argument("--install", action="store_true",
+                        help="δημιουργία ημερολογίου αλλαγών και triggers")
+    parser.add_argument("--full", action="store_true",
+                        help="πλήρες rebuild του cube και μηδενισμός watermark")
+    parser.add_argument("--keep-log", action="store_true",
+                        help="να μη διαγράφονται οι αλλαγές που εφαρμόστηκαν")
+    args = parser.parse_args()
+
+    if args.install:
+        install()
+    if args.full:
+        full()
+    elif not args.install:
+        applied = incremental(purge=not args.keep_log)
+        print(f"Εφαρμόστηκαν {applied} αλλαγές.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+import argparse
+
+import numpy as np
+from sqlalchemy import text
+
+from data.db import disk_cache, engine, query_df, result_cache
+from data import queries, queries_raw
+from data.sketch import bucket_sql
+
+# Πλάτος κλάσης γαλακτοπαραγωγής (κιλά) και κάδου διάρκειας (ημέρες)
+CLASS_WIDTH = 50
+FDAYS_BUCKET = 10
+
+
+def floor_days(days):
+    """Το φίλτρο «διάρκεια ≥ days» όπως το απαντά το cube: αρχή του κάδου
+    διάρκειας που περιέχει το days (αρνητικό = χωρίς φίλτρο, αμετάβλητο)."""
+    days = int(days)
+    return days - days % FDAYS_BUCKET if days >= 0 else days
+
+
+# ------------------------------------------------------
+# production_cube: αθροίσματα (count, sum, sum of squares) ανά
+# φυλή x έτος x Γ.Π. x μήνα τοκετού x κλάση γάλακτος x κάδο διάρκειας.
+# Τα NULL αποθηκεύονται ως 0 / -1 ώστε το πρωτεύον κλειδί να είναι μοναδικό.
+# ------------------------------------------------------
+CUBE_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    breed_id     INT      NOT NULL,
+    p_year       SMALLINT NOT NULL,  -- 0 = χωρίς έτος
+    p_lact       SMALLINT NOT NULL,  -- 0 = χωρίς Γ.Π.
+    birth_month  TINYINT  NOT NULL,  -- 0 = χωρίς ημ/νία τοκετού
+    milk_class   SMALLINT NOT NULL,  -- -1 = χωρίς γαλακτοπαραγωγή
+    fdays_bucket SMALLINT NOT NULL,  -- -1 = χωρίς διάρκεια
+    n_rows   BIGINT NOT NULL,
+    n_bdate  BIGINT NOT NULL,
+    n_days   BIGINT NOT NULL,
+    s_days   DOUBLE NOT NULL,
+    q_days   DOUBLE NOT NULL,
+    n_milk   BIGINT NOT NULL,
+    s_milk   DOUBLE NOT NULL,
+    q_milk   DOUBLE NOT NULL,
+    n_births BIGINT NOT NULL,
+    s_births DOUBLE NOT NULL,
+    q_births DOUBLE NOT NULL,
+    PRIMARY KEY (breed_id, p_lact, p_year, birth_month, milk_class, fdays_bucket)
+);
+CREATE INDEX idx_cube_year ON {table} (breed_id, p_year, p_lact)
+"""
+
+# Διαστάσεις του κελιού στο οποίο ανήκει μια γραμμή production· breed: η
+# φυλή της γραμμής (στο ημερολόγιο του data/refresh.py είναι ήδη στη γραμμή)
+def cell_dimensions(breed="herds.h_breed_id"):
+    return f"""
+    COALESCE({breed}, 0) AS breed_id,
+    COALESCE(production.p_year, 0) AS p_year,
+    COALESCE(production.p_lact, 0) AS p_lact,
+    COALESCE(MONTH(production.p_bdate), 0) AS birth_month,
+    COALESCE(FLOOR(production.p_fmilk / {CLASS_WIDTH * 1000}), -1) AS milk_class,
+    COALESCE(FLOOR(production.p_fdays / {FDAYS_BUCKET}) * {FDAYS_BUCKET}, -1) AS fdays_bucket
+"""
+
+
+CELL_DIMENSIONS = cell_dimensions()
+
+CUBE_BUILD = f"""
+INSERT INTO {{table}}
+SELECT
+    {CELL_DIMENSIONS},
+    COUNT(*),
+    COUNT(p_bdate),
+    COUNT(p_fdays),
+    COALESCE(SUM(p_fdays), 0),
+    COALESCE(SUM(p_fdays * p_fdays), 0),
+    COUNT(p_fmilk),
+    COALESCE(SUM(p_fmilk / 1000), 0),
+    COALESCE(SUM(POW(p_fmilk / 1000, 2)), 0),
+    COUNT(p_males + p_females),
+    COALESCE(SUM(p_males + p_females), 0),
+    COALESCE(SUM(POW(p_males + p_females, 2)), 0)
+FROM production
+JOIN herds ON production.p_herd_id = herds.h_id
+GROUP BY 1, 2, 3, 4, 5, 6
+"""
+
+
+# ------------------------------------------------------
+# production_milk_hist: κατανομή ανά 1 κιλό γάλακτος (φυλή x έτος x Γ.Π. x κιλό),
+# από την οποία το data/histogram.py φτιάχνει κλάσεις οποιουδήποτε πλάτους.
+# ------------------------------------------------------
+MILK_HIST_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    breed_id INT      NOT NULL,
+    p_year   SMALLINT NOT NULL,  -- 0 = χωρίς έτος
+    p_lact   SMALLINT NOT NULL,  -- 0 = χωρίς Γ.Π.
+    milk_kg  SMALLINT NOT NULL,  -- FLOOR(p_fmilk / 1000)
+    n_rows   BIGINT NOT NULL,
+    n_days   BIGINT NOT NULL,
+    s_days   DOUBLE NOT NULL,
+    q_days   DOUBLE NOT NULL,
+    s_milk   DOUBLE NOT NULL,
+    q_milk   DOUBLE NOT NULL,
+    PRIMARY KEY (breed_id, p_lact, p_year, milk_kg)
+)
+"""
+
+
+def milk_hist_dimensions(breed="herds.h_breed_id"):
+    return f"""
+    COALESCE({breed}, 0) AS breed_id,
+    COALESCE(production.p_year, 0) AS p_year,
+    COALESCE(production.p_lact, 0) AS p_lact,
+    FLOOR(production.p_fmilk / 1000) AS milk_kg
+"""
+
+
+MILK_HIST_DIMENSIONS = milk_hist_dimensions()
+
+MILK_HIST_BUILD = f"""
+INSERT INTO {{table}}
+SELECT
+    {MILK_HIST_DIMENSIONS},
+    COUNT(*),
+    COUNT(p_fdays),
+    COALESCE(SUM(p_fdays), 0),
+    COALESCE(SUM(p_fdays * p_fdays), 0),
+    SUM(p_fmilk / 1000),
+    SUM(POW(p_fmilk / 1000, 2))
+FROM production
+JOIN herds ON production.p_herd_id = herds.h_id
+WHERE production.p_fmilk IS NOT NULL
+GROUP BY 1, 2, 3, 4
+"""
+
+# ------------------------------------------------------
+# production_sketch: quantile sketches (data/sketch.py) γάλακτος και
+# διάρκειας, ένας κάδος ανά γραμμή. Χωρίς κλάση γάλακτος: οι αναφορές
+# εκατοστημορίων ομαδοποιούν μόνο ανά έτος, μήνα και Γ.Π., και ο κάδος
+# γάλακτος ήδη ορίζει την τιμή με ακρίβεια 1%.
+# ------------------------------------------------------
+SKETCH_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    breed_id     INT      NOT NULL,
+    p_year       SMALLINT NOT NULL,
+    p_lact       SMALLINT NOT NULL,
+    birth_month  TINYINT  NOT NULL,
+    fdays_bucket SMALLINT NOT NULL,
+    measure      TINYINT  NOT NULL,  -- 0 = γάλα (κιλά), 1 = διάρκεια (ημέρες)
+    bucket       SMALLINT NOT NULL,
+    n            BIGINT   NOT NULL,
+    PRIMARY KEY (breed_id, p_lact, p_year, birth_month, fdays_bucket, measure, bucket)
+)
+"""
+
+
+def sketch_dimensions(breed="herds.h_breed_id"):
+    return f"""
+    COALESCE({breed}, 0) AS breed_id,
+    COALESCE(production.p_year, 0) AS p_year,
+    COALESCE(production.p_lact, 0) AS p_lact,
+    COALESCE(MONTH(production.p_bdate), 0) AS birth_month,
+    COALESCE(FLOOR(production.p_fdays / {FDAYS_BUCKET}) * {FDAYS_BUCKET}, -1) AS fdays_bucket
+"""
+
+
+_PRODUCTION = "production\nJOIN herds ON production.p_herd_id = herds.h_id"
+
+
+def sketch_select(measure, source=_PRODUCTION, count="COUNT(*)", where="", breed="herds.h_breed_id"):
+    """SELECT των κάδων ενός μέτρου ("milk" / "days") ανά κελί του sketch."""
+    column, code = {
+        "milk": ("production.p_fmilk", 0),
+        "days": ("production.p_fdays", 1),
+    }[measure]
+    value = f"{column} / 1000" if measure == "milk" else column
+    return f"""
+SELECT
+    {sketch_dimensions(breed)},
+    {code},
+    {bucket_sql(value)},
+    {count}
+FROM {source}
+WHERE {column} IS NOT NULL {where}
+GROUP BY 1, 2, 3, 4, 5, 6, 7
+"""
+
+
+SKETCH_BUILD = "INSERT INTO {table}" + sketch_select("milk") + "UNION ALL" + sketch_select("days")
+
+# Πίνακες που ξαναχτίζονται μαζί: (όνομα, DDL, INSERT). Το DDL είναι ένα
+# CREATE TABLE και, μετά από ";", τα ευρετήριά του.
+ROLLUPS = [
+    ("production_cube", CUBE_DDL, CUBE_BUILD),
+    ("production_milk_hist", MILK_HIST_DDL, MILK_HIST_BUILD),
+    ("production_sketch", SKETCH_DDL, SKETCH_BUILD),
+]
+
+
+def ddl_statements(ddl, table):
+    """(CREATE TABLE, [CREATE INDEX, ...]) του ddl για τον πίνακα table."""
+    create, *indexes = (s.strip() for s in ddl.format(table=table).split(";"))
+    return create, indexes
+
+
+def _swap_statements(dialect):
+    """Αντικατάσταση κάθε πίνακα από τον {πίνακα}_new (ο παλιός -> {πίνακα}_old)."""
+    if dialect == "mysql":
+        # Ένα RENAME TABLE για όλους: ατομικό στη MariaDB / MySQL
+        return ["RENAME TABLE " + ", ".join(
+            f"{table} TO {table}_old, {table}_new TO {table}" for table, _, _ in ROLLUPS
+        )]
+    # SQLite / DuckDB / PostgreSQL: ατομικό μέσα στη συναλλαγή του rebuild.
+    # Τα ευρετήρια του παλιού πίνακα φεύγουν πρώτα (η DuckDB δεν μετονομάζει
+    # πίνακα με ευρετήρια)· ξαναφτιάχνονται στον νέο μετά την αντικατάσταση.
+    statements = []
+    for table, ddl, _ in ROLLUPS:
+        for index in ddl_statements(ddl, table)[1]:
+            statements.append(f"DROP INDEX IF EXISTS {index.split()[2]}")
+        statements += [
+            f"ALTER TABLE {table} RENAME TO {table}_old",
+            f"ALTER TABLE {table}_new RENAME TO {table}",
+        ]
+    return statements
+
+
+def rebuild(before_build=None):
+    """Ξαναχτίζει τους πίνακες του ROLLUPS σε νέους πίνακες και τους
+    αντικαθιστά ατομικά.
+
+    Το before_build(conn) εκτελείται στην ίδια συναλλαγή με τα INSERT
+    (π.χ. για να γραφτεί το watermark του data/refresh.py).
+    """
+    with engine.begin() as conn:
+        for table, ddl, _ in ROLLUPS:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}_new"))
+            conn.execute(text(ddl_statements(ddl, f"{table}_new")[0]))
+            conn.execute(text(ddl_statements(ddl, table)[0]))
+        if before_build is not None:
+            before_build(conn)
+        for table, _, build in ROLLUPS:
+            conn.execute(text(build.format(table=f"{table}_new")))
+        for statement in _swap_statements(conn.dialect.name):
+            conn.execute(text(statement))
+        # Τα ευρετήρια μετά την αντικατάσταση, με τα οριστικά ονόματα (στη
+        # PostgreSQL / SQLite τα ονόματα ευρετηρίων είναι μοναδικά ανά βάση)
+        for table, ddl, _ in ROLLUPS:
+            conn.execute(text(f"DROP TABLE {table}_old"))
+            for index in ddl_statements(ddl, table)[1]:
+                conn.execute(text(index))
+    result_cache.clear()
+    # Η κοινή cache του δίσκου αδειάζει αμέσως, όχι στον επόμενο έλεγχο αλλαγών
+    if disk_cache is not None:
+        disk_cache.invalidate([table for table, _, _ in ROLLUPS])
+
+
+def verify(breed, lact_from=1, lact_to=15, year_from=1900, year_to=2100, min_days=0):
+    """Συγκρίνει τις αναφορές του cube με τις αρχικές πάνω στο production."""
+    params = {
+        "breed": breed,
+        "lact_from": lact_from,
+        "lact_to": lact_to,
+        "year_from": year_from,
+        "year_to": year_to,
+        "min_days": floor_days(min_days),
+    }
+    pairs = {
+        "DATA_PRODUCTION": queries_raw.RAW_PRODUCTION,
+        "DATA_PRODUCTION_TOTAL": queries_raw.RAW_PRODUCTION_TOTAL,
+        "DATA_PRODUCTION_MONTH": queries_raw.RAW_PRODUCTION_MONTH,
+        "DATA_PRODUCTION_LACT": queries_raw.RAW_PRODUCTION_LACT,
+        "DATA_CLASSIFICATION": queries_raw.RAW_CLASSIFICATION,
+    }
+    ok = True
+    for name, raw_sql in pairs.items():
+        cube_df = query_df(getattr(queries, name), params, cache=False)
+        raw_df = query_df(raw_sql, params, cache=False)
+        numeric = [c for c in raw_df.columns if c != "class_range"]
+        same = (
+            cube_df.shape == raw_df.shape
+            and np.allclose(
+                cube_df[numeric].astype(float), raw_df[numeric].astype(float),
+                rtol=1e-6, equal_nan=True
+            )
+        )
+        print(f"{name}: {'OK' if same else 'ΔΙΑΦΟΡΑ'}")
+        ok = ok and same
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Διαχείριση του production_cube και του production_milk_hist")
+    parser.add_argument("--verify", type=int, metavar="BREED",
+                        help="έλεγχος ακρίβειας για τη φυλή BREED αντί για rebuild")
+    args = parser.parse_args()
+
+    if args.verify is not None:
+        raise SystemExit(0 if verify(args.verify) else 1)
+    rebuild()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import math
+
+import numpy as np
+
+# ------------------------------------------------------
+# Συγχωνεύσιμα quantile sketches με λογαριθμικούς κάδους (DDSketch):
+# η τιμή x > 0 πέφτει στον κάδο k = CEIL(LN(x) / LN(GAMMA)) και κάθε
+# εκατοστημόριο εκτιμάται με σχετικό σφάλμα έως SKETCH_ACCURACY.
+# Οι κάδοι αποθηκεύονται ως γραμμές (production_sketch), άρα δύο sketches
+# συγχωνεύονται με απλό SUM στη βάση ή πρόσθεση πινάκων εδώ.
+# ------------------------------------------------------
+SKETCH_ACCURACY = 0.01
+GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+# Κάδος για τιμές <= 0 (εκτιμώνται ως 0)
+ZERO_BUCKET = -32768
+
+# Κωδικοί της στήλης measure του production_sketch
+MEASURES = {"milk": 0, "days": 1}
+
+QUANTILES = (0.1, 0.5, 0.9)
+
+
+def bucket_sql(expr):
+    """Έκφραση SQL του κάδου για την τιμή expr (ίδια με το bucket_of)."""
+    return f"CASE WHEN {expr} > 0 THEN CEIL(LN({expr}) / {LOG_GAMMA!r}) ELSE {ZERO_BUCKET} END"
+
+
+def bucket_of(values):
+    values = np.asarray(values, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        buckets = np.ceil(np.log(values) / LOG_GAMMA)
+    return np.where(values > 0, buckets, ZERO_BUCKET).astype(np.int64)
+
+
+class QuantileSketch:
+    """Πλήθη ανά κάδο, ως πυκνός πίνακας από τον κάδο offset και μετά."""
+
+    __slots__ = ("offset", "counts", "zeros")
+
+    def __init__(self, offset=0, counts=None, zeros=0):
+        self.offset = offset
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else counts
+        self.zeros = zeros
+
+    @classmethod
+    def from_buckets(cls, buckets, counts):
+        buckets = np.asarray(buckets, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.int64)
+        zero = buckets == ZERO_BUCKET
+        zeros = int(counts[zero].sum())
+        buckets, counts = buckets[~zero], counts[~zero]
+        if buckets.size == 0:
+            return cls(zeros=zeros)
+        offset = int(buckets.min())
+        dense = np.bincount(buckets - offset, weights=counts).astype(np.int64)
+        return cls(offset, dense, zeros)
+
+    @property
+    def n(self):
+        return int(self.counts.sum()) + self.zeros
+
+    def merge(self, other):
+        if not other.counts.size:
+            return QuantileSketch(self.offset, self.counts, self.zeros + other.zeros)
+        if not self.counts.size:
+            return QuantileSketch(other.offset, other.counts, self.zeros + other.zeros)
+        offset = min(self.offset, other.offset)
+        end = max(self.offset + self.counts.size, other.offset + other.counts.size)
+        counts = np.zeros(end - offset, dtype=np.int64)
+        counts[self.offset - offset:self.offset - offset + self.counts.size] += self.counts
+        counts[other.offset - offset:other.offset - offset + other.counts.size] += other.counts
+        return QuantileSketch(offset, counts, self.zeros + other.zeros)
+
+    __add__ = merge
+
+    def quantile(self, q):
+        """Εκτίμηση του q-εκατοστημορίου (None αν το sketch είναι άδειο)."""
+        n = self.n
+        if n == 0:
+            return None
+        rank = q * (n - 1)
+        if rank < self.zeros:
+            return 0.0
+        cumulative = np.cumsum(self.counts) + self.zeros
+        k = self.offset + int(np.searchsorted(cumulative, rank, side="right"))
+        # Μέσο του κάδου (GAMMA^(k-1), GAMMA^k] με σχετικό σφάλμα <= SKETCH_ACCURACY
+        return 2 * GAMMA ** k / (GAMMA + 1)
+
+
+class CellSketch:
+    """Sketches γάλακτος (κιλά) και διάρκειας (ημέρες) ενός κελιού."""
+
+    __slots__ = ("milk", "days")
+
+    def __init__(self, milk=None, days=None):
+        self.milk = milk if milk is not None else QuantileSketch()
+        self.days = days if days is not None else QuantileSketch()
+
+    def merge(self, other):
+        return CellSketch(self.milk + other.milk, self.days + other.days)
+
+    __add__ = merge
+
+    def quantile_values(self):
+        return [self.milk.quantile(q) for q in QUANTILES] + [
+            self.days.quantile(q) for q in QUANTILES
+        ]
+
+
+QUANTILE_COLUMNS = [
+    f"p{round(q * 100)}_{measure}" for measure in ("milk", "days") for q in QUANTILES
+]
+
+
+def parse(df):
+    """Γραμμές των DATA_SKETCH_* (grp, measure, bucket, n) -> {ομάδα: CellSketch}."""
+    cells = {}
+    if df.empty:
+        return cells
+    names = {code: name for name, code in MEASURES.items()}
+    grp = df["grp"].to_numpy(dtype=np.int64)
+    measure = df["measure"].to_numpy(dtype=np.int64)
+    bucket = df["bucket"].to_numpy(dtype=np.int64)
+    n = df["n"].to_numpy(dtype=np.int64)
+    # Ταξινόμηση ανά (ομάδα, μέτρο) και ένα from_buckets ανά συνεχές τμήμα
+    order = np.lexsort((measure, grp))
+    grp, measure, bucket, n = grp[order], measure[order], bucket[order], n[order]
+    starts = np.flatnonzero(np.r_[True, (grp[1:] != grp[:-1]) | (measure[1:] != measure[:-1])])
+    ends = np.r_[starts[1:], grp.size]
+    for start, end in zip(starts, ends):
+        cell = cells.setdefault(int(grp[start]), CellSketch())
+        sketch = QuantileSketch.from_buckets(bucket[start:end], n[start:end])
+        setattr(cell, names[int(measure[start])], sketch)
+    return cells
@@ -0,0 +1,387 @@
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from data import queries
+from data.db import engine, query_df
+from data.queries_lookup import LOOKUP_LACTS, LOOKUP_YEARS
+from data.rollup import CLASS_WIDTH
+from data.sketch import MEASURES, bucket_of
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshot")
+
+# ------------------------------------------------------
+# Εξαγωγή production ⋈ herds σε Parquet, διαμερισμένο ανά φυλή / έτος.
+# Τα NULL σε φυλή, έτος, Γ.Π. και μήνα γράφονται ως 0, όπως στο production_cube.
+# ------------------------------------------------------
+EXPORT_SQL = """
+SELECT
+    COALESCE(herds.h_breed_id, 0) AS breed_id,
+    COALESCE(production.p_year, 0) AS p_year,
+    COALESCE(production.p_lact, 0) AS p_lact,
+    COALESCE(MONTH(production.p_bdate), 0) AS birth_month,
+    production.p_bdate,
+    production.p_fdays,
+    production.p_fmilk,
+    production.p_males,
+    production.p_females
+FROM production
+JOIN herds ON production.p_herd_id = herds.h_id
+"""
+
+SCHEMA = pa.schema([
+    ("breed_id", pa.int32()),
+    ("p_year", pa.int16()),
+    ("p_lact", pa.int16()),
+    ("birth_month", pa.int8()),
+    ("p_bdate", pa.date32()),
+    ("p_fdays", pa.float64()),
+    ("p_fmilk", pa.float64()),
+    ("p_males", pa.float64()),
+    ("p_females", pa.float64()),
+])
+
+
+# Όρια του write_dataset: οι διαμερίσεις φυλή × έτος ξεπερνούν εύκολα το
+# προεπιλεγμένο max_partitions=1024· τα ανοιχτά αρχεία μένουν κάτω από το ulimit.
+MAX_PARTITIONS = int(os.getenv("SNAPSHOT_MAX_PARTITIONS", "100000"))
+MAX_OPEN_FILES = int(os.getenv("SNAPSHOT_MAX_OPEN_FILES", "512"))
+
+
+def _versions(path):
+    """Οι εκδόσεις <path>.v<ns> του snapshot, από την παλαιότερη."""
+    parent, name = os.path.split(os.path.abspath(path))
+    prefix = f"{name}.v"
+    found = [
+        entry for entry in os.listdir(parent)
+        if entry.startswith(prefix) and entry[len(prefix):].isdigit()
+    ]
+    return [os.path.join(parent, entry) for entry in sorted(found, key=lambda e: int(e[len(prefix):]))]
+
+
+def export(path=SNAPSHOT_DIR, chunksize=200_000):
+    """Γράφει νέα έκδοση <path>.v<ns> και γυρίζει ατομικά το symlink <path> σε αυτή.
+
+    Οι αναγνώστες βλέπουν πάντα πλήρες snapshot: είτε το παλιό είτε το νέο.
+    Η προηγούμενη έκδοση κρατιέται για όσους workers τη διαβάζουν ακόμη.
+    """
+    version = f"{os.path.abspath(path)}.v{time.time_ns()}"
+
+    def batches():
+        with engine.connect() as conn:
+            # Χωρίς stream_results ο pymysql φέρνει όλο το αποτέλεσμα στη μνήμη
+            # πριν από το πρώτο chunk.
+            conn = conn.execution_options(stream_results=True)
+            for chunk in pd.read_sql(EXPORT_SQL, conn, chunksize=chunksize):
+                chunk["p_bdate"] = pd.to_datetime(chunk["p_bdate"])
+                yield from pa.Table.from_pandas(
+                    chunk, schema=SCHEMA, preserve_index=False
+                ).to_batches()
+
+    try:
+        ds.write_dataset(
+            batches(),
+            version,
+            schema=SCHEMA,
+            format="parquet",
+            partitioning=ds.partitioning(
+                pa.schema([("breed_id", pa.int32()), ("p_year", pa.int16())]),
+                flavor="hive",
+            ),
+            max_partitions=MAX_PARTITIONS,
+            max_open_files=MAX_OPEN_FILES,
+        )
+    except BaseException:
+        shutil.rmtree(version, ignore_errors=True)
+        raise
+
+    # Φάκελος της παλιάς μορφής (πριν από τις εκδόσεις): αντικαθίσταται μία φορά
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    link = f"{path}.link"
+    if os.path.lexists(link):
+        os.remove(link)
+    os.symlink(version, link)
+    os.replace(link, path)
+    _dataset.cache_clear()
+
+    for old in _versions(path)[:-2]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+# ------------------------------------------------------
+# Backend: απαντά στα ίδια queries με το SQL, μέσα στο process
+# ------------------------------------------------------
+class _DatasetCache:
+    """Το dataset της τρέχουσας έκδοσης· ανοίγει ξανά όταν το SNAPSHOT_DIR
+    δείχνει σε άλλη (export από οποιοδήποτε process)."""
+
+    def __init__(self):
+        self._dataset = None
+        self._version = None
+
+    def __call__(self):
+        version = os.path.realpath(SNAPSHOT_DIR)
+        if self._dataset is None or version != self._version:
+            self._dataset = ds.dataset(version, format="parquet", partitioning="hive")
+            self._version = version
+        return self._dataset
+
+    def cache_clear(self):
+        self._dataset = None
+        self._version = None
+
+
+_dataset = _DatasetCache()
+
+
+def _load(params, columns, filters):
+    """Διαβάζει μόνο τις στήλες / διαμερίσεις που χρειάζονται για τα φίλτρα
+    του αντίστοιχου query (filters: "year", "lact", "min_days")."""
+    expr = ds.field("breed_id") == int(params["breed"])
+    if "year" in filters:
+        expr &= (ds.field("p_year") >= int(params["year_from"])) & (
+            ds.field("p_year") <= int(params["year_to"])
+        )
+    if "lact" in filters:
+        expr &= (ds.field("p_lact") >= int(params["lact_from"])) & (
+            ds.field("p_lact") <= int(params["lact_to"])
+        )
+    # min_days < 0: χωρίς φίλτρο διάρκειας (και οι εγγραφές χωρίς διάρκεια)
+    if "min_days" in filters and int(params["min_days"]) >= 0:
+        expr &= ds.field("p_fdays") >= int(params["min_days"])
+
+    table = _dataset().to_table(columns=columns, filter=expr)
+    milk = pc.divide(table["p_fmilk"], 1000.0)
+    births = pc.add(table["p_males"], table["p_females"])
+    return (
+        table.append_column("milk", milk)
+        .append_column("births", births)
+        .append_column("one", pa.array(np.ones(table.num_rows, dtype=np.int64)))
+        .append_column("days_sq", pc.multiply(table["p_fdays"], table["p_fdays"]))
+        .append_column("milk_sq", pc.multiply(milk, milk))
+        .append_column("births_sq", pc.multiply(births, births))
+    )
+
+
+_BASE_COLUMNS = ["p_year", "p_lact", "p_bdate", "p_fdays", "p_fmilk", "p_males", "p_females"]
+
+_REPORT_AGGREGATES = [
+    ("p_fdays", "mean", "avg_days"),
+    ("milk", "mean", "avg_milk"),
+    ("milk", "stddev", "std_milk"),
+    ("p_fdays", "stddev", "std_days"),
+    ("births", "stddev", "std_births"),
+    ("p_bdate", "count", "count_births"),
+    ("births", "mean", "avg_births"),
+]
+
+
+def _grouped(table, key, aggregates, key_name):
+    result = table.group_by(key).aggregate([(col, fn) for col, fn, _ in aggregates])
+    df = result.to_pandas().rename(
+        columns={f"{col}_{fn}": name for col, fn, name in aggregates}
+    )
+    df = df.rename(columns={key: key_name}).sort_values(key_name)
+    return df[[key_name] + [name for _, _, name in aggregates]].reset_index(drop=True)
+
+
+def _nullify_zero(df, column):
+    df[column] = df[column].astype("object").where(df[column] != 0, None)
+    return df
+
+
+def _report(key, key_name, filters):
+    def handler(params):
+        table = _load(params, _BASE_COLUMNS + ["birth_month"], filters)
+        return _nullify_zero(_grouped(table, key, _REPORT_AGGREGATES, key_name), key_name)
+    return handler
+
+
+def _totals(params):
+    t = _load(params, _BASE_COLUMNS, ("lact", "min_days"))
+    return pd.DataFrame([{
+        "avg_days": pc.mean(t["p_fdays"]).as_py(),
+        "avg_milk": pc.mean(t["milk"]).as_py(),
+        "std_milk": pc.stddev(t["milk"]).as_py(),
+        "std_days": pc.stddev(t["p_fdays"]).as_py(),
+        "std_births": pc.stddev(t["births"]).as_py(),
+        "total_births": pc.count(t["p_bdate"]).as_py(),
+        "avg_poly": pc.mean(t["births"]).as_py(),
+        "total_years": pc.count_distinct(
+            pc.filter(t["p_year"], pc.not_equal(t["p_year"], 0))
+        ).as_py(),
+    }])
+
+
+def _with_class(table):
+    milk_class = pc.floor(pc.divide(table["p_fmilk"], CLASS_WIDTH * 1000.0))
+    table = table.append_column("milk_class", pc.cast(milk_class, pa.int64()))
+    return table.filter(pc.is_valid(table["milk_class"]))
+
+
+def _classification(params):
+    table = _with_class(_load(params, _BASE_COLUMNS, ("year", "lact")))
+    df = _grouped(table, "milk_class", [
+        ("one", "sum", "total_animals"),
+        ("p_fdays", "mean", "avg_days"),
+        ("milk", "mean", "avg_milk_kg"),
+        ("milk", "stddev", "std_milk_kg"),
+    ], "class_no")
+    df.insert(1, "class_range", [
+        f"{c * CLASS_WIDTH + 1} - {(c + 1) * CLASS_WIDTH}" for c in df["class_no"]
+    ])
+    return df
+
+
+_CELL_AGGREGATES = [
+    ("one", "sum", "n_rows"),
+    ("p_bdate", "count", "n_bdate"),
+    ("p_fdays", "count", "n_days"),
+    ("p_fdays", "sum", "s_days"),
+    ("days_sq", "sum", "q_days"),
+    ("milk", "count", "n_milk"),
+    ("milk", "sum", "s_milk"),
+    ("milk_sq", "sum", "q_milk"),
+    ("births", "count", "n_births"),
+    ("births", "sum", "s_births"),
+    ("births_sq", "sum", "q_births"),
+]
+
+
+def _cells(group):
+    def handler(params):
+        table = _load(params, _BASE_COLUMNS + ["birth_month"], ("year", "lact", "min_days"))
+        if group == "milk_class":
+            table = _with_class(table)
+        keys = list(dict.fromkeys([group, "p_year", "p_lact"]))
+        result = table.group_by(keys).aggregate(
+            [(col, fn) for col, fn, _ in _CELL_AGGREGATES]
+        )
+        df = result.to_pandas().rename(
+            columns={f"{col}_{fn}": name for col, fn, name in _CELL_AGGREGATES}
+        ).fillna(0)
+        df["grp"] = df[group]
+        return df
+    return handler
+
+
+def _sketches(group, filters):
+    def handler(params):
+        table = _load(params, _BASE_COLUMNS + ["birth_month"], filters)
+        df = table.select([group, "milk", "p_fdays"]).to_pandas()
+        frames = []
+        for measure, column in (("milk", "milk"), ("days", "p_fdays")):
+            part = df[df[column].notna()]
+            frames.append(pd.DataFrame({
+                "grp": part[group],
+                "measure": MEASURES[measure],
+                "bucket": bucket_of(part[column]),
+            }).groupby(["grp", "measure", "bucket"]).size().rename("n").reset_index())
+        return pd.concat(frames, ignore_index=True)
+    return handler
+
+
+def _milk_hist(params):
+    table = _load(params, _BASE_COLUMNS, ("year", "lact"))
+    table = table.filter(pc.is_valid(table["p_fmilk"]))
+    table = table.append_column("milk_kg", pc.cast(pc.floor(table["milk"]), pa.int64()))
+    aggregates = [
+        ("one", "sum", "n_rows"),
+        ("p_fdays", "count", "n_days"),
+        ("p_fdays", "sum", "s_days"),
+        ("days_sq", "sum", "q_days"),
+        ("milk", "sum", "s_milk"),
+        ("milk_sq", "sum", "q_milk"),
+    ]
+    return _grouped(table, "milk_kg", aggregates, "milk_kg").fillna(0)
+
+
+def _raw_lactations(params):
+    table = _load(params, _BASE_COLUMNS, ("year", "lact"))
+    table = table.filter(
+        pc.and_(pc.is_valid(table["p_fdays"]), pc.is_valid(table["p_fmilk"]))
+    )
+    return pd.DataFrame({
+        "days": table["p_fdays"].to_numpy(),
+        "milk_kg": table["milk"].to_numpy(),
+    })
+
+
+def _distinct(column):
+    def handler(params):
+        values = pc.unique(_dataset().to_table(columns=[column])[column])
+        values = sorted(v for v in values.to_pylist() if v)
+        return pd.DataFrame({column: values})
+    return handler
+
+
+HANDLERS = {
+    queries.DATA_PRODUCTION: _report("p_year", "p_year", ("lact", "min_days")),
+    queries.DATA_PRODUCTION_TOTAL: _totals,
+    queries.DATA_PRODUCTION_MONTH: _report("birth_month", "month_bdate", ("year", "lact")),
+    queries.DATA_PRODUCTION_LACT: _report("p_lact", "p_lact", ("year", "min_days")),
+    queries.DATA_CLASSIFICATION: _classification,
+    queries.DATA_CELLS_YEAR: _cells("p_year"),
+    queries.DATA_CELLS_MONTH: _cells("birth_month"),
+    queries.DATA_CELLS_LACT: _cells("p_lact"),
+    queries.DATA_CELLS_CLASS: _cells("milk_class"),
+    queries.DATA_SKETCH_YEAR: _sketches("p_year", ("lact", "min_days")),
+    queries.DATA_SKETCH_MONTH: _sketches("birth_month", ("year", "lact")),
+    queries.DATA_SKETCH_LACT: _sketches("p_lact", ("year", "min_days")),
+    queries.DATA_MILK_HIST: _milk_hist,
+    queries.DATA_RAW_LACTATIONS: _raw_lactations,
+    LOOKUP_YEARS: _distinct("p_year"),
+    LOOKUP_LACTS: _distinct("p_lact"),
+}
+
+
+# ------------------------------------------------------
+# Σύγκριση χρόνων: SQL (production_cube) vs Parquet snapshot
+# ------------------------------------------------------
+def bench(breed, repeat=5):
+    params = {
+        "breed": breed, "lact_from": 1, "lact_to": 15,
+        "year_from": 0, "year_to": 9999, "min_days": 90,
+    }
+    names = [
+        "DATA_PRODUCTION", "DATA_PRODUCTION_TOTAL", "DATA_PRODUCTION_MONTH",
+        "DATA_PRODUCTION_LACT", "DATA_CLASSIFICATION",
+    ]
+    print(f"{'query':<24}{'sql (ms)':>12}{'parquet (ms)':>14}")
+    for name in names:
+        sql = getattr(queries, name)
+        timings = []
+        for run in (lambda: query_df(sql, params, cache=False),
+                    lambda: HANDLERS[sql](params)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                run()
+            timings.append((time.perf_counter() - start) / repeat * 1000)
+        print(f"{name:<24}{timings[0]:>12.1f}{timings[1]:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parquet snapshot του production")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("export", help="εξαγωγή snapshot στο SNAPSHOT_DIR")
+    bench_parser = sub.add_parser("bench", help="σύγκριση με το SQL")
+    bench_parser.add_argument("breed", type=int)
+    bench_parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export()
+    else:
+        bench(args.breed, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
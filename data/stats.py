@@ -0,0 +1,566 @@
+import functools
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import product
+
+import pandas as pd
+
+from data import instrument, lookups, sketch
+from data.cache import make_key
+from data.db import CACHE_TTL, DATA_BACKEND, cached, query_chunks, query_df, query_many
+from data.explorer import Lactations
+from data.histogram import MilkHistogram
+from data.rollup import CLASS_WIDTH, floor_days
+from data.queries import (
+    DATA_BREEDS_CELLS_CLASS,
+    DATA_BREEDS_CELLS_LACT,
+    DATA_BREEDS_CELLS_MONTH,
+    DATA_BREEDS_CELLS_YEAR,
+    DATA_BREEDS_MILK_HIST,
+    DATA_CELLS_CLASS,
+    DATA_CELLS_LACT,
+    DATA_CELLS_MONTH,
+    DATA_CELLS_YEAR,
+    DATA_MILK_HIST,
+    DATA_RAW_LACTATIONS,
+    DATA_SKETCH_LACT,
+    DATA_SKETCH_MONTH,
+    DATA_SKETCH_YEAR,
+)
+
+# Όριο μνήμης των κελιών του CellStore (εκτός της cache αποτελεσμάτων)
+CELLS_MAX_MB = int(os.getenv("CELLS_MAX_MB", "64"))
+
+# Εκτίμηση μνήμης (bytes) ενός Cell με τα Moments του και μιας συντεταγμένης
+# (έτος, Γ.Π.) ενός slice (κλειδί, λεξικό ομάδων, covered)
+_CELL_BYTES = 640
+_COORD_BYTES = 320
+
+# Στήλες των αναφορών ανά έτος / μήνα / Γ.Π. (ίδιες με το data/queries.py)
+REPORT_COLUMNS = [
+    "avg_days", "avg_milk", "std_milk", "std_days",
+    "std_births", "count_births", "avg_births",
+]
+
+
+class Moments:
+    """Συγχωνεύσιμος συσσωρευτής (n, mean, M2) κατά Welford / Chan."""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+
+    @classmethod
+    def from_sums(cls, n, s, q):
+        """Από πλήθος, άθροισμα και άθροισμα τετραγώνων."""
+        n = int(n)
+        if n == 0:
+            return cls()
+        mean = float(s) / n
+        return cls(n, mean, max(float(q) - mean * float(s), 0.0))
+
+    def merge(self, other):
+        """Παράλληλη συγχώνευση (Chan et al.) χωρίς αλλαγή των ορισμάτων."""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            return other
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.n / n
+        m2 = self.m2 + other.m2 + delta * delta * self.n * other.n / n
+        return Moments(n, mean, m2)
+
+    __add__ = merge
+
+    @property
+    def avg(self):
+        return self.mean if self.n else math.nan
+
+    @property
+    def std(self):
+        """Τυπική απόκλιση πληθυσμού (όπως η STD της MariaDB)."""
+        return math.sqrt(self.m2 / self.n) if self.n else math.nan
+
+
+class Cell:
+    """Συγκεντρωτικά ενός κελιού: πλήθη και Moments για διάρκεια, γάλα, γεννήσεις."""
+
+    __slots__ = ("n_rows", "n_bdate", "days", "milk", "births")
+
+    def __init__(self, n_rows=0, n_bdate=0, days=None, milk=None, births=None):
+        self.n_rows = n_rows
+        self.n_bdate = n_bdate
+        self.days = days or Moments()
+        self.milk = milk or Moments()
+        self.births = births or Moments()
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            int(row.n_rows),
+            int(row.n_bdate),
+            Moments.from_sums(row.n_days, row.s_days, row.q_days),
+            Moments.from_sums(row.n_milk, row.s_milk, row.q_milk),
+            Moments.from_sums(row.n_births, row.s_births, row.q_births),
+        )
+
+    def merge(self, other):
+        return Cell(
+            self.n_rows + other.n_rows,
+            self.n_bdate + other.n_bdate,
+            self.days + other.days,
+            self.milk + other.milk,
+            self.births + other.births,
+        )
+
+    __add__ = merge
+
+    def report_values(self):
+        return [
+            self.days.avg, self.milk.avg, self.milk.std, self.days.std,
+            self.births.std, self.n_bdate, self.births.avg,
+        ]
+
+
+class _Slice:
+    """Κελιά μιας (ομάδας, φυλής, min_days): (έτος, Γ.Π.) -> {ομάδα: Cell}."""
+
+    def __init__(self):
+        self.created = time.monotonic()
+        self.covered = set()
+        self.cells = {}
+        self.bytes = 0
+
+
+class CellStore:
+    """Cache κελιών ανά φυλή· για κάθε εύρος ετών / Γ.Π. φέρνει από τη βάση
+    μόνο τα κελιά που λείπουν και συγχωνεύει τα υπόλοιπα τοπικά.
+
+    queries: ομάδα -> query κελιών, parse: DataFrame -> {(έτος, Γ.Π.): {ομάδα: κελί}},
+    breed_queries: ομάδα -> το ίδιο query για πολλές φυλές (βλ. prefetch).
+
+    Τα slices λήγουν μετά από ttl δευτ. και, πάνω από max_bytes (εκτίμηση),
+    φεύγουν τα λιγότερο πρόσφατα χρησιμοποιημένα.
+    """
+
+    def __init__(self, queries, parse, ttl=CACHE_TTL, breed_queries=None,
+                 max_bytes=CELLS_MAX_MB * 1024 * 1024):
+        self.queries = queries
+        self.parse = parse
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.breed_queries = breed_queries or {}
+        self._slices = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _slice(self, key):
+        with self._lock:
+            now = time.monotonic()
+            sl = self._slices.get(key)
+            if sl is not None and now - sl.created <= self.ttl:
+                self._slices.move_to_end(key)
+                return sl
+            # Νέο slice: φεύγουν και τα ληγμένα κλειδιά που δεν ξαναζητήθηκαν
+            for stale in [k for k, old in self._slices.items() if now - old.created > self.ttl]:
+                self._drop(stale)
+            sl = self._slices[key] = _Slice()
+            return sl
+
+    def _drop(self, key):
+        self._bytes -= self._slices.pop(key).bytes
+
+    def _fill(self, key, sl, fetched, missing):
+        """Αποθηκεύει τα κελιά που ήρθαν για τις συντεταγμένες missing (υπό το lock)."""
+        added = 0
+        for coord in missing:
+            old = sl.cells.get(coord)
+            if old is not None:
+                added -= _COORD_BYTES + _CELL_BYTES * len(old)
+            sl.cells[coord] = cells = fetched.get(coord, {})
+            added += _COORD_BYTES + _CELL_BYTES * len(cells)
+        sl.covered |= missing
+        sl.bytes += added
+        # Slice που έληξε / αφαιρέθηκε όσο ερχόταν το query δεν μετρά πια
+        if self._slices.get(key) is not sl:
+            return
+        self._bytes += added
+        for lru in list(self._slices):
+            if self._bytes <= self.max_bytes:
+                break
+            if lru != key:
+                self._drop(lru)
+
+    def stats(self):
+        with self._lock:
+            return {"slices": len(self._slices), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    def groups(self, group, breed, years, lacts, min_days=-1):
+        """Επιστρέφει {τιμή ομάδας: Cell} για τα δοσμένα έτη και Γ.Π.
+
+        Το min_days στρογγυλεύεται στον κάδο διάρκειας (floor_days), ίδια για
+        σελίδες, API και εξαγωγή.
+        """
+        key = (group, int(breed), floor_days(min_days))
+        sl = self._slice(key)
+
+        wanted = set(product(years, lacts))
+        missing = wanted - sl.covered
+        if missing:
+            self._fetch(group, key, sl, missing)
+
+        merged = {}
+        for coord in wanted:
+            for grp, cell in sl.cells.get(coord, {}).items():
+                merged[grp] = merged[grp] + cell if grp in merged else cell
+        return merged
+
+    def prefetch(self, group, breeds, years, lacts, min_days=-1):
+        """Φέρνει τα κελιά πολλών φυλών μαζί: ένα query ανά ορθογώνιο που
+        λείπει, αντί για ένα ανά φυλή (π.χ. για τη μαζική εξαγωγή)."""
+        slices = {
+            int(breed): self._slice((group, int(breed), floor_days(min_days))) for breed in breeds
+        }
+        wanted = set(product(years, lacts))
+        missing = set().union(*(wanted - sl.covered for sl in slices.values()))
+        if not missing:
+            return
+
+        batch = {}
+        for i, (years_box, lacts_box) in enumerate(_boxes(missing)):
+            batch[i] = (self.breed_queries[group], {
+                "breeds": tuple(slices),
+                "min_days": floor_days(min_days),
+                "year_from": years_box[0],
+                "year_to": years_box[1],
+                "lact_from": lacts_box[0],
+                "lact_to": lacts_box[1],
+            })
+
+        fetched = {breed: {} for breed in slices}
+        for df in query_many(batch, cache="disk").values():
+            for breed, part in df.groupby("breed_id"):
+                fetched[int(breed)].update(self.parse(part))
+
+        with self._lock:
+            for breed, sl in slices.items():
+                self._fill((group, breed, floor_days(min_days)), sl, fetched[breed], missing)
+
+    def clear(self):
+        with self._lock:
+            self._slices.clear()
+            self._bytes = 0
+
+    def _fetch(self, group, key, sl, missing):
+        # Ένα query ανά ορθογώνιο (έτη x Γ.Π.) που λείπει, όλα παράλληλα
+        batch = {}
+        for i, (years, lacts) in enumerate(_boxes(missing)):
+            batch[i] = (self.queries[group], {
+                "breed": key[1],
+                "min_days": key[2],
+                "year_from": years[0],
+                "year_to": years[1],
+                "lact_from": lacts[0],
+                "lact_to": lacts[1],
+            })
+
+        fetched = {}
+        for df in query_many(batch, cache="disk").values():
+            fetched.update(self.parse(df))  # τα ορθογώνια δεν επικαλύπτονται
+
+        with self._lock:
+            self._fill(key, sl, fetched, missing)
+
+
+def _runs(values):
+    """Συνεχόμενα διαστήματα [(από, έως), ...] από ταξινομημένους ακεραίους."""
+    runs = []
+    for v in values:
+        if runs and v == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], v)
+        else:
+            runs.append((v, v))
+    return runs
+
+
+def _boxes(missing):
+    """Χωρίζει τα κελιά που λείπουν σε ορθογώνια ((έτος από, έως), (Γ.Π. από, έως)).
+
+    Διαδοχικά έτη με τα ίδια διαστήματα Γ.Π. ενώνονται σε ένα ορθογώνιο.
+    """
+    by_year = {}
+    for year, lact in missing:
+        by_year.setdefault(year, []).append(lact)
+
+    boxes = []
+    span, prev_runs = None, None
+    for year in sorted(by_year):
+        runs = _runs(sorted(by_year[year]))
+        if runs == prev_runs:
+            span = (span[0], year)
+        else:
+            if span is not None:
+                boxes.extend((span, run) for run in prev_runs)
+            span, prev_runs = (year, year), runs
+    if span is not None:
+        boxes.extend((span, run) for run in prev_runs)
+    return boxes
+
+
+def _parse_cells(df):
+    cells = {}
+    for row in df.itertuples(index=False):
+        coord = (int(row.p_year), int(row.p_lact))
+        cells.setdefault(coord, {})[int(row.grp)] = Cell.from_row(row)
+    return cells
+
+
+cell_store = CellStore({
+    "year": DATA_CELLS_YEAR,
+    "month": DATA_CELLS_MONTH,
+    "lact": DATA_CELLS_LACT,
+    "class": DATA_CELLS_CLASS,
+}, _parse_cells, breed_queries={
+    "year": DATA_BREEDS_CELLS_YEAR,
+    "month": DATA_BREEDS_CELLS_MONTH,
+    "lact": DATA_BREEDS_CELLS_LACT,
+    "class": DATA_BREEDS_CELLS_CLASS,
+})
+
+
+# ------------------------------------------------------
+# Αναφορές (ίδια μορφή με τα DATA_* του data/queries.py)
+# ------------------------------------------------------
+REPORTS = {}
+
+# Όσες απαντώνται από τα aggregates (φθηνές)· μόνο αυτές προθερμαίνονται
+AGGREGATE_REPORTS = []
+
+
+def _report(name, aggregate=True):
+    """Δηλώνει μια αναφορά και καταγράφει τη χρήση της (βλ. data/warmer.py).
+
+    aggregate=False: διαβάζει ατομικές εγγραφές του production και δεν
+    προθερμαίνεται.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(**params):
+            instrument.record_usage(name, params)
+            return fn(**params)
+        REPORTS[name] = wrapper
+        if aggregate:
+            AGGREGATE_REPORTS.append(name)
+        return wrapper
+    return decorator
+
+
+def _all_years():
+    # 0 = εγγραφές χωρίς έτος (εμφανίζονται ως NULL, όπως στο αρχικό GROUP BY)
+    return (0,) + lookups.years()
+
+
+def _all_lacts():
+    return (0,) + lookups.lacts()
+
+
+def _between(values, low, high):
+    return [v for v in values if low <= v <= high]
+
+
+def _report_frame(groups, key_name):
+    rows = [
+        [None if grp == 0 else grp] + cell.report_values()
+        for grp, cell in sorted(groups.items())
+    ]
+    return pd.DataFrame(rows, columns=[key_name] + REPORT_COLUMNS)
+
+
+@_report("year")
+def year_report(breed, lact_from, lact_to, min_days, **_):
+    """Αντίστοιχο του DATA_PRODUCTION."""
+    groups = cell_store.groups(
+        "year", breed, _all_years(),
+        _between(lookups.lacts(), lact_from, lact_to), min_days
+    )
+    return _report_frame(groups, "p_year")
+
+
+@_report("totals")
+def year_totals(breed, lact_from, lact_to, min_days, **_):
+    """Αντίστοιχο του DATA_PRODUCTION_TOTAL, από τα ίδια κελιά ανά έτος."""
+    groups = cell_store.groups(
+        "year", breed, _all_years(),
+        _between(lookups.lacts(), lact_from, lact_to), min_days
+    )
+    total = Cell()
+    for cell in groups.values():
+        total = total + cell
+    return pd.DataFrame([{
+        "avg_days": total.days.avg,
+        "avg_milk": total.milk.avg,
+        "std_milk": total.milk.std,
+        "std_days": total.days.std,
+        "std_births": total.births.std,
+        "total_births": total.n_bdate,
+        "avg_poly": total.births.avg,
+        "total_years": sum(1 for year in groups if year != 0),
+    }])
+
+
+@_report("month")
+def month_report(breed, lact_from, lact_to, year_from, year_to, **_):
+    """Αντίστοιχο του DATA_PRODUCTION_MONTH."""
+    groups = cell_store.groups(
+        "month", breed,
+        _between(lookups.years(), year_from, year_to),
+        _between(lookups.lacts(), lact_from, lact_to),
+    )
+    return _report_frame(groups, "month_bdate")
+
+
+@_report("lact")
+def lact_report(breed, year_from, year_to, min_days, **_):
+    """Αντίστοιχο του DATA_PRODUCTION_LACT."""
+    groups = cell_store.groups(
+        "lact", breed,
+        _between(lookups.years(), year_from, year_to), _all_lacts(), min_days
+    )
+    return _report_frame(groups, "p_lact")
+
+
+@_report("class")
+def class_report(breed, lact_from, lact_to, year_from, year_to, **_):
+    """Αντίστοιχο του DATA_CLASSIFICATION."""
+    groups = cell_store.groups(
+        "class", breed,
+        _between(lookups.years(), year_from, year_to),
+        _between(lookups.lacts(), lact_from, lact_to),
+    )
+    rows = [
+        {
+            "class_no": grp,
+            "class_range": f"{grp * CLASS_WIDTH + 1} - {(grp + 1) * CLASS_WIDTH}",
+            "total_animals": cell.n_rows,
+            "avg_days": cell.days.avg,
+            "avg_milk_kg": cell.milk.avg,
+            "std_milk_kg": cell.milk.std,
+        }
+        for grp, cell in sorted(groups.items())
+    ]
+    return pd.DataFrame(rows, columns=[
+        "class_no", "class_range", "total_animals",
+        "avg_days", "avg_milk_kg", "std_milk_kg",
+    ])
+
+
+@_report("histogram")
+def milk_histogram(breed, lact_from, lact_to, year_from, year_to, **_):
+    """Κατανομή ανά 1 κιλό (MilkHistogram) για κλάσεις οποιουδήποτε πλάτους."""
+    df = query_df(DATA_MILK_HIST, {
+        "breed": breed,
+        "lact_from": lact_from,
+        "lact_to": lact_to,
+        "year_from": year_from,
+        "year_to": year_to,
+    }, arrow=True)
+    return MilkHistogram.from_frame(df)
+
+
+@_report("lactations", aggregate=False)
+def lactations(breed, lact_from, lact_to, year_from, year_to, **_):
+    """Ατομικές γαλακτικές περίοδοι (Lactations) για τη σελίδα Εξερεύνησης.
+
+    Διαβάζονται σε chunks (query_chunks) και κρατιούνται στην cache
+    αποτελεσμάτων μόνο ως δύο στήλες float32.
+    """
+    params = {
+        "breed": breed,
+        "lact_from": lact_from,
+        "lact_to": lact_to,
+        "year_from": year_from,
+        "year_to": year_to,
+    }
+    df = cached(
+        make_key(DATA_RAW_LACTATIONS, params),
+        lambda: Lactations.frame(query_chunks(DATA_RAW_LACTATIONS, params)),
+    )
+    return Lactations.from_frame(df)
+
+
+# ------------------------------------------------------
+# Πολλές φυλές μαζί (μαζική εξαγωγή, data/export.py)
+# ------------------------------------------------------
+def prefetch(breeds, lact_from, lact_to, year_from, year_to, min_days, **_):
+    """Φέρνει τα κελιά των αναφορών year / totals / month / lact / class για
+    όλες τις φυλές με ένα query ανά ομάδα (αντί για ένα ανά φυλή)."""
+    if DATA_BACKEND == "parquet":
+        return  # το snapshot απαντά μέσα στο process, χωρίς round trips
+    years = _between(lookups.years(), year_from, year_to)
+    lacts = _between(lookups.lacts(), lact_from, lact_to)
+    cell_store.prefetch("year", breeds, _all_years(), lacts, min_days)
+    cell_store.prefetch("month", breeds, years, lacts)
+    cell_store.prefetch("lact", breeds, years, _all_lacts(), min_days)
+    cell_store.prefetch("class", breeds, years, lacts)
+
+
+def milk_histograms(breeds, lact_from, lact_to, year_from, year_to, **_):
+    """{φυλή: MilkHistogram} για πολλές φυλές, με ένα query."""
+    params = {"lact_from": lact_from, "lact_to": lact_to, "year_from": year_from, "year_to": year_to}
+    if DATA_BACKEND == "parquet":
+        return {breed: milk_histogram.__wrapped__(breed=breed, **params) for breed in breeds}
+    df = query_df(DATA_BREEDS_MILK_HIST, {"breeds": tuple(breeds), **params}, cache=False, arrow=True)
+    parts = dict(iter(df.groupby("breed_id")))
+    empty = df.iloc[0:0]
+    return {breed: MilkHistogram.from_frame(parts.get(breed, empty)) for breed in breeds}
+
+
+# ------------------------------------------------------
+# Εκατοστημόρια (p10 / p50 / p90) γάλακτος και διάρκειας ανά ομάδα, από
+# τα quantile sketches· ένα query ανά φίλτρο, όπως η κατανομή ανά κιλό
+# ------------------------------------------------------
+def _quantile_frame(sql, params, key_name):
+    groups = sketch.parse(query_df(sql, params, arrow=True))
+    rows = [
+        [None if grp == 0 else grp] + cell.quantile_values()
+        for grp, cell in sorted(groups.items())
+    ]
+    return pd.DataFrame(rows, columns=[key_name] + sketch.QUANTILE_COLUMNS)
+
+
+@_report("year_quantiles")
+def year_quantiles(breed, lact_from, lact_to, min_days, **_):
+    return _quantile_frame(DATA_SKETCH_YEAR, {
+        "breed": breed,
+        "lact_from": lact_from,
+        "lact_to": lact_to,
+        "min_days": floor_days(min_days),
+    }, "p_year")
+
+
+@_report("month_quantiles")
+def month_quantiles(breed, lact_from, lact_to, year_from, year_to, **_):
+    return _quantile_frame(DATA_SKETCH_MONTH, {
+        "breed": breed,
+        "lact_from": lact_from,
+        "lact_to": lact_to,
+        "year_from": year_from,
+        "year_to": year_to,
+    }, "month_bdate")
+
+
+@_report("lact_quantiles")
+def lact_quantiles(breed, year_from, year_to, min_days, **_):
+    return _quantile_frame(DATA_SKETCH_LACT, {
+        "breed": breed,
+        "year_from": year_from,
+        "year_to": year_to,
+        "min_days": floor_days(min_days),
+    }, "p_lact")
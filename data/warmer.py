@@ -0,0 +1,112 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from data import changes, instrument, lookups, stats
+
+log = logging.getLogger(__name__)
+
+WARM_CONCURRENCY = int(os.getenv("WARM_CONCURRENCY", "4"))
+WARM_BUDGET = float(os.getenv("WARM_BUDGET", "120"))     # δευτ. ανά γύρο
+WARM_TOP = int(os.getenv("WARM_TOP", "20"))              # συχνότεροι συνδυασμοί
+
+# Η φυλή 1 είναι η "Άγνωστη" και δεν εμφανίζεται στις αναφορές
+UNKNOWN_BREED = 1
+
+
+def default_tasks():
+    """Προεπιλεγμένα φίλτρα των σελίδων για κάθε φυλή."""
+    years = lookups.years()
+    if not years:
+        return []
+    tasks = []
+    for breed in lookups.breeds().values():
+        if breed == UNKNOWN_BREED:
+            continue
+        params = {
+            "breed": breed, "lact_from": 1, "lact_to": 15, "min_days": 90,
+            "year_from": years[0], "year_to": years[-1],
+        }
+        tasks.extend((name, params) for name in stats.AGGREGATE_REPORTS)
+    return tasks
+
+
+def frequent_tasks(top=WARM_TOP):
+    """Οι συχνότεροι (αναφορά, φίλτρα) από τη χρήση του process και το QUERY_LOG."""
+    counts = instrument.logged_usage() + instrument.usage
+    usage = [(key, n) for key, n in counts.most_common() if key[0] in stats.AGGREGATE_REPORTS]
+    return [(name, dict(params)) for (name, params), _ in usage[:top]]
+
+
+class CacheWarmer:
+    """Προϋπολογίζει τις αναφορές στο ξεκίνημα και μετά από κάθε αλλαγή των
+    aggregates (βλ. data/changes.py)."""
+
+    def __init__(self, concurrency=WARM_CONCURRENCY, budget=WARM_BUDGET):
+        self.concurrency = concurrency
+        self.budget = budget
+        self.last_run = None
+        self._thread = None
+        self._changed = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Ξεκινά το thread του warmer και τον έλεγχο αλλαγών (μία φορά ανά process)."""
+        with self._lock:
+            if self._thread is None and self.budget > 0:
+                changes.detector.subscribe(self._on_change)
+                self._thread = threading.Thread(
+                    target=self._run, name="cache-warmer", daemon=True
+                )
+                self._thread.start()
+        changes.start()
+
+    def warm(self):
+        """Ένας γύρος προθέρμανσης· επιστρέφει πόσες αναφορές υπολογίστηκαν."""
+        deadline = time.monotonic() + self.budget
+        tasks = list(dict.fromkeys(
+            (name, tuple(sorted(params.items())))
+            for name, params in default_tasks() + frequent_tasks()
+        ))
+
+        def run(task):
+            if time.monotonic() > deadline:
+                return False
+            name, params = task
+            # Χωρίς καταγραφή χρήσης, ώστε ο warmer να μην ενισχύει τον εαυτό του
+            stats.REPORTS[name].__wrapped__(**dict(params))
+            return True
+
+        done = 0
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="warm") as pool:
+            for ok in pool.map(run, tasks):
+                done += bool(ok)
+        self.last_run = {"time": time.time(), "tasks": len(tasks), "done": done}
+        return done
+
+    def _on_change(self, names):
+        if names & changes.AGGREGATES:
+            self._changed.set()
+
+    def _warm_safely(self):
+        try:
+            self.warm()
+        except Exception:
+            log.exception("Αποτυχία προθέρμανσης cache")
+
+    def _run(self):
+        self._warm_safely()
+        while True:
+            # Νέα φόρτωση δεδομένων: οι caches έχουν ήδη ακυρωθεί, ξανά προθέρμανση
+            self._changed.wait()
+            self._changed.clear()
+            self._warm_safely()
+
+
+warmer = CacheWarmer()
+
+
+def start():
+    warmer.start()
@@ -1,9 +1,7 @@
 import streamlit as st
-import plotly.graph_objects as go
 
-from data.db import query_df
-from data.queries_lookup import LOOKUP_BREEDS, LOOKUP_YEARS
-from data.queries import DATA_PRODUCTION_MONTH
+from data import figures, filters, warmer
+from data.frames import display
 
 
 # ------------------------------------------------------
@@ -13,21 +11,9 @@ st.title("Διασπορά Γαλακτοπαραγωγής & Διάρκειας
 
 
 # ------------------------------------------------------
-# Load lookup tables
+# Background cache warming
 # ------------------------------------------------------
-breeds_df = query_df(LOOKUP_BREEDS)
-breed_options = {}
-for index, row in breeds_df.iterrows():
-    key = row["name"]
-    value = row["id"]
-    breed_options[key] = value
-
-years_df = query_df(LOOKUP_YEARS)
-years_option = {}
-for index, row in years_df.iterrows():
-    key = row["p_year"]
-    value = row["p_year"]
-    years_option[key] = value
+warmer.start()  # προθέρμανση cache στο παρασκήνιο (μία φορά ανά process)
 
 
 # ------------------------------------------------------
@@ -40,38 +26,25 @@ with st.container():
 
     # Φυλή
     with col1:
-        selected_breed = st.selectbox(
-            "Επιλογή Φυλής",
-            list(breed_options.keys())
-        )
+        selected_breed_id = filters.breed()
 
     # Γαλακτική περίοδος Από
     with col2:
-        lact_from = st.selectbox(
-            "Γαλ. περίοδος Από",
-            list(range(1, 16)),
-            index=0
-        )
+        lact_from = filters.lact_from()
 
     # Γαλακτική περίοδος Έως
-        lact_to = st.selectbox(
-            "Γαλ. περίοδος Έως",
-            list(range(1, 16)),
-            index=14
-        )
+        lact_to = filters.lact_to()
 
     # Έτος
     with col3:
-        year_from = st.selectbox(
-            "Επιλογή Έτους Από",
-            list(years_option.keys())
-        )
+        year_from = filters.year_from()
+
+        year_to = filters.year_to()
 
-        year_to = st.selectbox(
-            "Επιλογή Έτους Έως",
-            list(years_option.keys()),
-            index=len(years_option) - 1  # -> τελευταία (μέγιστη)
-        )
+    # Εκατοστημόρια (προαιρετικά)
+    show_quantiles = filters.quantiles(
+        help="Διάμεσος και εύρος p10 – p90 γάλακτος / διάρκειας, από quantile sketches (σχετικό σφάλμα έως 1%)."
+    )
 
 # Έλεγχος εύρους Γαλ. Περιόδου
 if lact_from > lact_to:
@@ -83,8 +56,6 @@ if year_from > year_to:
     st.error("Στο πεδίο Παραγωγικό Έτος η τιμή 'Από' πρέπει να είναι μικρότερη ή ίση από την 'Έως'.")
     st.stop()
 
-selected_breed_id = breed_options[selected_breed]
-
 # Αν η φυλή είναι Άγνωστη -> μην εκτελείς query
 if selected_breed_id == 1:
     st.warning("Παρακαλώ επιλέξτε έγκυρη φυλή.")
@@ -104,8 +75,9 @@ params = {
     "year_to": int(year_to)
 }
 
-df = query_df(DATA_PRODUCTION_MONTH, params)
-df = df.round(2)  # 2 decimal places
+df = filters.report("month", **params)
+if show_quantiles:
+    df = df.merge(filters.report("month_quantiles", **params), on="month_bdate", how="left")
 
 if df.empty:
     st.warning("Δεν βρέθηκαν δεδομένα για τα συγκεκριμένα φίλτρα.")
@@ -117,78 +89,25 @@ if df.empty:
 # ------------------------------------------------------
 st.subheader("Μέση Γαλακτοπαραγωγή (kg) + Τυπική Απόκλιση ανά Μήνα")
 
-fig = go.Figure()
-
-fig.add_trace(
-    go.Scatter(
-        x=df["month_bdate"],
-        y=df["avg_milk"],
-        mode="markers",           # Μόνο σημεία (Χωρίς γραμμή)
-        name="Avg Milk (kg)",
-        error_y=dict(
-            type="data",
-            array=df["std_milk"],
-            visible=True
-        ),
-        marker=dict(
-            size=10,
-            symbol="circle",
-            color="#4DA6FF"
-        )
-    )
+st.plotly_chart(
+    figures.error_bar_chart(df, "month_bdate", "Μήνας Τοκετού", "milk", quantiles=show_quantiles),
+    width="stretch"
 )
 
-fig.update_layout(
-    xaxis_title="Μήνας Τοκετού",
-    yaxis_title="Μ.Ο. Γαλ/γής (kg)",
-    showlegend=False,
-    height=500,
-    margin=dict(l=70, r=40, t=40, b=60)
-)
-fig.update_xaxes(dtick=1)
-st.plotly_chart(fig, width="stretch")
-
 
 # ------------------------------------------------------
 # Plotly: Μέση Διάρκεια Γαλ/γής
 # ------------------------------------------------------
 st.subheader("Μέση Διάρκεια Γαλακτοπαραγωγής (ημέρες) + Τυπική Απόκλιση ανά Μήνα")
 
-fig2 = go.Figure()
-
-fig2.add_trace(
-    go.Scatter(
-        x=df["month_bdate"],
-        y=df["avg_days"],
-        mode="markers",           # μόνο σημεία
-        name="Avg Duration (days)",
-        error_y=dict(
-            type="data",
-            array=df["std_days"],
-            visible=True
-        ),
-        marker=dict(
-            size=10,
-            symbol="circle",
-            color="#FFB347"        # πορτοκαλί, ώστε να ξεχωρίζει από το μπλε του milk
-        )
-    )
+st.plotly_chart(
+    figures.error_bar_chart(df, "month_bdate", "Μήνας Τοκετού", "days", quantiles=show_quantiles),
+    width="stretch"
 )
 
-fig2.update_layout(
-    xaxis_title="Μήνας Τοκετού",
-    yaxis_title="Μ.Ο. Διάρκεια (ημέρες)",
-    showlegend=False,
-    height=500,
-    margin=dict(l=70, r=40, t=40, b=60)
-)
-
-fig2.update_xaxes(dtick=1)
-st.plotly_chart(fig2, width="stretch")
-
 
 # ------------------------------------------------------
 # Data Table
 # ------------------------------------------------------
 st.subheader("Πίνακας Δεδομένων")
-st.dataframe(df, width="stretch")
+st.dataframe(display(df), width="stretch")
@@ -0,0 +1,119 @@
+from datetime import datetime
+
+import streamlit as st
+import pandas as pd
+
+from data import changes, instrument
+from data.db import admission, disk_cache, result_cache
+from data.frames import display
+from data.stats import cell_store
+
+
+# ------------------------------------------------------
+# PAGE: Διαγνωστικά Queries
+# ------------------------------------------------------
+st.title("Διαγνωστικά Queries")
+
+
+# ------------------------------------------------------
+# Cache αποτελεσμάτων
+# ------------------------------------------------------
+st.subheader("Cache Αποτελεσμάτων")
+
+stats = result_cache.stats()
+lookups_total = stats["hits"] + stats["misses"]
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Εγγραφές", stats["entries"])
+col2.metric("Μέγεθος (MB)", round(stats["bytes"] / 1024 / 1024, 2))
+col3.metric("Hits / Misses", f"{stats['hits']} / {stats['misses']}")
+col4.metric(
+    "Hit ratio",
+    f"{stats['hits'] / lookups_total:.0%}" if lookups_total else "-"
+)
+
+if disk_cache is not None:
+    disk = disk_cache.stats()
+    disk_total = disk["hits"] + disk["misses"]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Εγγραφές (δίσκος)", disk["entries"])
+    col2.metric("Μέγεθος δίσκου (MB)", round(disk["bytes"] / 1024 / 1024, 2))
+    col3.metric("Hits / Misses (δίσκος)", f"{disk['hits']} / {disk['misses']}")
+    col4.metric(
+        "Hit ratio (δίσκος)",
+        f"{disk['hits'] / disk_total:.0%}" if disk_total else "-"
+    )
+
+cells = cell_store.stats()
+col1, col2, _, _ = st.columns(4)
+col1.metric("Slices κελιών", cells["slices"])
+col2.metric(
+    "Μέγεθος κελιών (MB, εκτίμηση)",
+    f"{cells['bytes'] / 1024 / 1024:.2f} / {cells['max_bytes'] / 1024 / 1024:.0f}"
+)
+
+queue = admission.stats()
+if queue["slots"] > 0:
+    col1, col2, _, _ = st.columns(4)
+    col1.metric("Βαριά queries σε εκτέλεση", f"{queue['running']} / {queue['slots']}")
+    col2.metric("Σε αναμονή", queue["waiting"])
+
+last_change = changes.detector.last_change
+if last_change:
+    st.caption(
+        f"Τελευταία αλλαγή δεδομένων: "
+        f"{datetime.fromtimestamp(last_change['time']):%Y-%m-%d %H:%M:%S} "
+        f"({', '.join(last_change['tables'])}), "
+        f"ακυρώθηκαν {last_change['dropped']} αποτελέσματα."
+    )
+
+st.write("---")
+
+
+# ------------------------------------------------------
+# Τελευταίες εκτελέσεις
+# ------------------------------------------------------
+records = list(instrument.records)
+if not records:
+    st.info("Δεν έχουν καταγραφεί ακόμη queries σε αυτό το process.")
+    st.stop()
+
+df = pd.DataFrame(records)
+
+st.subheader("Ανά Query")
+
+summary = (
+    df[df["cache"].isin(["miss", "off"])]
+    .groupby("name")["total_ms"]
+    .agg(["count", "mean", "max", lambda s: s.quantile(0.95)])
+    .rename(columns={"count": "Εκτελέσεις", "mean": "Μ.Ο. (ms)",
+                     "max": "Μέγιστο (ms)", "<lambda_0>": "p95 (ms)"})
+    .sort_values("Μ.Ο. (ms)", ascending=False)
+)
+st.dataframe(display(summary, 1), width="stretch")
+
+st.subheader("Τελευταίες Εκτελέσεις")
+st.dataframe(
+    display(df.drop(columns=["explain"]).iloc[::-1], 1),
+    width="stretch"
+)
+
+st.write("---")
+
+
+# ------------------------------------------------------
+# Αργά queries (με EXPLAIN)
+# ------------------------------------------------------
+st.subheader(f"Αργά Queries (≥ {instrument.SLOW_QUERY_MS:.0f} ms)")
+
+slow = [r for r in reversed(records) if r["slow"]]
+if not slow:
+    st.success("Κανένα αργό query.")
+
+for record in slow:
+    with st.expander(f"{record['time']} – {record['name']} – {record['total_ms']:.0f} ms"):
+        st.json(record["params"])
+        if record["explain"]:
+            st.dataframe(pd.DataFrame(record["explain"]), width="stretch")
+        else:
+            st.caption("Το EXPLAIN δεν είναι ακόμη διαθέσιμο.")
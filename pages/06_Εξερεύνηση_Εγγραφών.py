@@ -0,0 +1,157 @@
+import math
+
+import numpy as np
+import plotly.graph_objects as go
+import streamlit as st
+
+from data import filters, warmer
+from data.explorer import MAX_POINTS
+
+
+# ------------------------------------------------------
+# PAGE: Εξερεύνηση Ατομικών Εγγραφών
+# ------------------------------------------------------
+st.title("Εξερεύνηση Ατομικών Εγγραφών")
+
+
+# ------------------------------------------------------
+# Background cache warming
+# ------------------------------------------------------
+warmer.start()  # προθέρμανση cache στο παρασκήνιο (μία φορά ανά process)
+
+
+# ------------------------------------------------------
+# User Filters
+# ------------------------------------------------------
+with st.container():
+    st.subheader("Φίλτρα")
+
+    col1, col2, col3 = st.columns(3)
+
+    # Φυλή
+    with col1:
+        selected_breed_id = filters.breed()
+
+    # Γαλακτική περίοδος Από
+    with col2:
+        lact_from = filters.lact_from()
+
+        # Γαλακτική περίοδος Έως
+        lact_to = filters.lact_to()
+
+    # Έτος
+    with col3:
+        year_from = filters.year_from()
+
+        year_to = filters.year_to()
+
+# Έλεγχος εύρους Γαλ. Περιόδου
+if lact_from > lact_to:
+    st.error("Στο πεδίο Γαλ. περίοδος η τιμή 'Από' πρέπει να είναι μικρότερη ή ίση από την 'Έως'.")
+    st.stop()
+
+# Έλεγχος εύρους Έτους
+if year_from > year_to:
+    st.error("Στο πεδίο Παραγωγικό Έτος η τιμή 'Από' πρέπει να είναι μικρότερη ή ίση από την 'Έως'.")
+    st.stop()
+
+# Αν η φυλή είναι Άγνωστη -> exit
+if selected_breed_id == 1:
+    st.warning("Παρακαλώ επιλέξτε έγκυρη φυλή.")
+    st.stop()
+
+st.write("---")
+
+
+# ------------------------------------------------------
+# Execute SQL queries
+# ------------------------------------------------------
+params = {
+    "breed": int(selected_breed_id),
+    "lact_from": int(lact_from),
+    "lact_to": int(lact_to),
+    "year_from": int(year_from),
+    "year_to": int(year_to)
+}
+
+# Οι εγγραφές φέρνονται μία φορά ανά φίλτρο· το παράθυρο αλλάζει χωρίς νέο query
+lactations = filters.report("lactations", **params)
+
+if lactations.empty:
+    st.warning("Δεν βρέθηκαν δεδομένα για τα συγκεκριμένα φίλτρα.")
+    st.stop()
+
+
+# ------------------------------------------------------
+# Παράθυρο αξόνων (viewport)
+# ------------------------------------------------------
+(days_min, days_max), (milk_min, milk_max) = lactations.bounds()
+
+col_days, col_milk = st.columns(2)
+with col_days:
+    days_range = st.slider(
+        "Διάρκεια Γαλ/γής (ημέρες)",
+        min_value=math.floor(days_min),
+        max_value=max(math.ceil(days_max), math.floor(days_min) + 1),
+        value=(math.floor(days_min), max(math.ceil(days_max), math.floor(days_min) + 1))
+    )
+with col_milk:
+    milk_range = st.slider(
+        "Γαλακτοπαραγωγή (κιλά)",
+        min_value=math.floor(milk_min),
+        max_value=max(math.ceil(milk_max), math.floor(milk_min) + 1),
+        value=(math.floor(milk_min), max(math.ceil(milk_max), math.floor(milk_min) + 1))
+    )
+
+points, binned = lactations.view(days_range, milk_range)
+
+
+# ------------------------------------------------------
+# Scatter (WebGL)
+# ------------------------------------------------------
+st.subheader("Γαλακτοπαραγωγή ως προς Διάρκεια Γαλ/γής")
+
+if binned:
+    st.caption(
+        f"{points['n'].sum():,} εγγραφές στο παράθυρο, ομαδοποιημένες σε "
+        f"{len(points):,} κελιά (έως {MAX_POINTS:,} σημεία ανά γράφημα). "
+        "Στενέψτε το παράθυρο για ατομικές εγγραφές."
+    )
+    marker = dict(
+        size=5,
+        color=np.log10(points["n"]),
+        colorscale="Viridis",
+        colorbar=dict(title="log₁₀ πλήθος")
+    )
+    hovertemplate = (
+        "<b>Διάρκεια</b>: %{x:.0f} ημέρες<br>"
+        "<b>Γαλ/γή</b>: %{y:.2f} κιλά<br>"
+        "<b>Εγγραφές</b>: %{customdata}<extra></extra>"
+    )
+else:
+    st.caption(f"{len(points):,} εγγραφές στο παράθυρο.")
+    marker = dict(size=4, color="#4DA6FF", opacity=0.6)
+    hovertemplate = (
+        "<b>Διάρκεια</b>: %{x:.0f} ημέρες<br>"
+        "<b>Γαλ/γή</b>: %{y:.2f} κιλά<extra></extra>"
+    )
+
+fig = go.Figure()
+fig.add_trace(
+    go.Scattergl(
+        x=points["days"],
+        y=points["milk_kg"],
+        mode="markers",
+        marker=marker,
+        customdata=points["n"],
+        hovertemplate=hovertemplate
+    )
+)
+fig.update_layout(
+    template="plotly_white",
+    xaxis=dict(title="Διάρκεια Γαλ/γής (ημέρες)", range=list(days_range)),
+    yaxis=dict(title="Γαλακτοπαραγωγή (κιλά)", range=list(milk_range)),
+    height=600,
+    margin=dict(l=70, r=40, t=40, b=60)
+)
+st.plotly_chart(fig, width="stretch")
@@ -1,7 +1,10 @@
 import streamlit as st
 
+from data import warmer
+
 
 st.set_page_config(page_title="Ewe Analytics", layout="wide")
+warmer.start()  # προθέρμανση cache στο παρασκήνιο (μία φορά ανά process)
 st.title("eDataViz – Οπτικοποίηση Γαλακτοπαραγωγικών Δεδομένων")
 
 st.markdown("""Καλώς ήρθατε στο **eDataViz**!""")